@@ -21,9 +21,23 @@ app.config.from_object(Config)
 # Enable CORS (allow all origins for dev, restrict in prod)
 CORS(app)
 
-# Initialize Database
+# Initialize Database (pool instrumentation must be installed before the engine is created)
+from services.db_pool_monitor import pool_monitor
+pool_monitor.init_app(app)
 db.init_app(app)
 
+# Background batched writes for predictions/notifications
+from services.write_behind import write_behind
+write_behind.init_app(app)
+
+# Drops cached admin/dashboard counts when users or farms change
+from services.stats_service import stats_service
+stats_service.init_app(app)
+
+# Keeps the weather cache warm for all user/farm locations
+from services.weather_prefetcher import weather_prefetcher
+weather_prefetcher.init_app(app)
+
 # Register Blueprints
 app.register_blueprint(auth_bp, url_prefix='/api/auth')
 app.register_blueprint(users_bp, url_prefix='/api/users')
@@ -84,6 +98,13 @@ def handle_exception(e):
 def health_check():
     return jsonify({'status': 'healthy'}), 200
 
+@app.route('/api/ready')
+def readiness_check():
+    # Per-model load state, load time and memory footprint
+    from ml_models.model_loader import ModelLoader
+    status = ModelLoader().readiness()
+    return jsonify(status), 200 if status['ready'] else 503
+
 @app.route('/api/init-db')
 def initialize_database():
     try:
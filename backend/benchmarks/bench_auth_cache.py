@@ -0,0 +1,65 @@
+"""
+Authenticated request throughput with the token_required user cache on
+and off, against a throwaway SQLite database.
+
+Run from the backend directory:
+    python -m benchmarks.bench_auth_cache [requests] [threads]
+"""
+import datetime
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_db_file = os.path.join(tempfile.mkdtemp(), 'bench_auth.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_file}'
+os.environ.setdefault('MODEL_LOAD_MODE', 'lazy')
+
+import jwt
+from app import app
+from models import db, User
+from middleware.auth_middleware import user_cache
+
+
+def _setup():
+    with app.app_context():
+        db.create_all()
+        user = User(name='Bench Farmer', email='bench@agri.com', role='user', location='Multan')
+        user.set_password('bench')
+        db.session.add(user)
+        db.session.commit()
+        return user.id, jwt.encode({
+            'user_id': user.id, 'role': 'user',
+            'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+        }, app.config['JWT_SECRET_KEY'], algorithm='HS256')
+
+
+def run(label, user_id, token, requests, threads):
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+
+    def call(_):
+        resp = client.get(f'/api/users/{user_id}', headers=headers)
+        assert resp.status_code == 200, resp.status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(call, range(requests)))
+    elapsed = time.perf_counter() - start
+    print(f"{label:10s} | {requests / elapsed:8.1f} req/s | {elapsed / requests * 1000:6.2f} ms/req | "
+          f"cache {user_cache.stats()}")
+
+
+if __name__ == '__main__':
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    user_id, token = _setup()
+
+    user_cache.ttl = 0
+    run('cache off', user_id, token, requests, threads)
+    user_cache.ttl = 30
+    user_cache.clear()
+    run('cache on', user_id, token, requests, threads)
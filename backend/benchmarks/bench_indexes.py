@@ -0,0 +1,123 @@
+"""
+Query plans and latencies of the hot per-user / per-region queries on a
+seeded SQLite database, without and then with the composite indexes
+declared in models.py.
+
+Run from the backend directory:
+    python -m benchmarks.bench_indexes [predictions] [users] [iterations]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_db_file = os.path.join(tempfile.mkdtemp(), 'bench_indexes.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_file}'
+os.environ.setdefault('MODEL_LOAD_MODE', 'lazy')
+
+from sqlalchemy import func, insert, text
+from app import app
+from models import db, User, Farm, Prediction, Notification, NetworkMetric
+
+CHUNK = 50000
+TYPES = ['yield', 'recommendation', 'pest']
+REGIONS = ['North', 'Central', 'South', 'West']
+ISPS = ['Jazz', 'Telenor', 'Zong', 'PTCL', 'StormFiber']
+
+
+def _insert(model, count, make):
+    for start in range(0, count, CHUNK):
+        rows = [make(i) for i in range(start, min(start + CHUNK, count))]
+        db.session.execute(insert(model.__table__), rows)
+        db.session.commit()
+
+
+def _seed(predictions, users):
+    now = datetime.utcnow()
+    ago = lambda: now - timedelta(seconds=random.randint(0, 365 * 86400))
+    _insert(User, users, lambda i: {'name': f'User {i}', 'email': f'user{i}@agri.com',
+                                    'password_hash': 'x', 'role': 'user', 'status': 'active'})
+    _insert(Farm, users * 2, lambda i: {'user_id': random.randint(1, users), 'name': f'Farm {i}',
+                                        'location': 'Multan', 'size_acres': 10.0,
+                                        'created_at': now, 'updated_at': now})
+    _insert(Prediction, predictions, lambda i: {'user_id': random.randint(1, users),
+                                                'prediction_type': random.choice(TYPES),
+                                                'input_data': '{}', 'result_data': '{}',
+                                                'created_at': ago()})
+    _insert(Notification, predictions // 2, lambda i: {'user_id': random.randint(1, users),
+                                                       'title': 'Alert', 'message': 'msg',
+                                                       'type': 'info', 'is_read': False,
+                                                       'created_at': ago()})
+    _insert(NetworkMetric, predictions // 2, lambda i: {'region': random.choice(REGIONS),
+                                                        'isp_name': random.choice(ISPS),
+                                                        'latency_ms': random.uniform(10, 200),
+                                                        'packet_loss_rate': random.random(),
+                                                        'timestamp': ago()})
+
+
+QUERIES = {
+    'history (user)': lambda uid: Prediction.query.filter_by(user_id=uid)
+        .order_by(Prediction.created_at.desc()).limit(20),
+    'history (user, type)': lambda uid: Prediction.query.filter_by(user_id=uid, prediction_type='yield')
+        .order_by(Prediction.created_at.desc()).limit(20),
+    'notifications (user)': lambda uid: Notification.query.filter_by(user_id=uid)
+        .order_by(Notification.created_at.desc()).limit(20),
+    'farms (user)': lambda uid: Farm.query.filter_by(user_id=uid),
+    'network by region': lambda uid: db.session.query(
+        NetworkMetric.region, func.avg(NetworkMetric.latency_ms),
+        func.avg(NetworkMetric.packet_loss_rate), func.count(NetworkMetric.id)
+    ).group_by(NetworkMetric.region),
+    'network by isp': lambda uid: db.session.query(
+        NetworkMetric.isp_name, func.avg(NetworkMetric.latency_ms), func.count(NetworkMetric.id)
+    ).group_by(NetworkMetric.isp_name),
+}
+
+
+def _plan(query):
+    sql = str(query.statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+    rows = db.session.execute(text(f'EXPLAIN QUERY PLAN {sql}')).fetchall()
+    return '; '.join(str(row[-1]) for row in rows)
+
+
+def run(label, users, iterations):
+    print(f"\n== {label} ==")
+    for name, build in QUERIES.items():
+        build(1).all()  # warm the page cache
+        start = time.perf_counter()
+        for _ in range(iterations):
+            build(random.randint(1, users)).all()
+        elapsed = (time.perf_counter() - start) / iterations * 1000
+        print(f"{name:22s} | {elapsed:9.3f} ms | {_plan(build(1))}")
+
+
+def _indexes():
+    return [ix for model in (Farm, Prediction, Notification, NetworkMetric) for ix in model.__table__.indexes]
+
+
+if __name__ == '__main__':
+    predictions = int(sys.argv[1]) if len(sys.argv) > 1 else 2000000
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    iterations = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+    with app.app_context():
+        db.create_all()
+        for index in _indexes():
+            index.drop(bind=db.engine)
+        started = time.perf_counter()
+        _seed(predictions, users)
+        print(f"Seeded {predictions} predictions, {predictions // 2} notifications, "
+              f"{predictions // 2} network metrics in {time.perf_counter() - started:.1f}s")
+
+        run('without composite indexes', users, iterations)
+
+        started = time.perf_counter()
+        for index in _indexes():
+            index.create(bind=db.engine)
+        db.session.execute(text('ANALYZE'))
+        print(f"\nCreated {len(_indexes())} indexes in {time.perf_counter() - started:.1f}s")
+
+        run('with composite indexes', users, iterations)
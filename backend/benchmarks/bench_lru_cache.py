@@ -0,0 +1,96 @@
+"""
+utils.dsa.LRUCache vs functools.lru_cache vs a locked OrderedDict under
+multi-threaded load (Zipf-like key popularity, 90% reads / 10% writes).
+
+Run from the backend directory:
+    python -m benchmarks.bench_lru_cache [ops_per_thread] [threads]
+"""
+import functools
+import os
+import random
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.dsa import LRUCache
+
+CAPACITY = 1024
+KEYSPACE = 8192
+
+
+class LockedOrderedDict:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            if key in self.data:
+                self.data.move_to_end(key)
+                return self.data[key]
+            return None
+
+    def put(self, key, value):
+        with self.lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            if len(self.data) > self.capacity:
+                self.data.popitem(last=False)
+
+
+def _keys(n, seed):
+    rng = random.Random(seed)
+    return [int(rng.paretovariate(1.2)) % KEYSPACE for _ in range(n)]
+
+
+def run(label, worker, ops, threads):
+    key_sets = [_keys(ops, seed) for seed in range(threads)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(worker, key_sets))
+    elapsed = time.perf_counter() - start
+    print(f"{label:28s} | {ops * threads / elapsed / 1e6:6.2f} M ops/s")
+
+
+if __name__ == '__main__':
+    ops = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    lru = LRUCache(CAPACITY)
+    def lru_worker(keys):
+        for i, k in enumerate(keys):
+            if i % 10 == 0:
+                lru.put(k, k)
+            else:
+                lru.get(k)
+
+    lru_ttl = LRUCache(CAPACITY, ttl=60)
+    def lru_compute_worker(keys):
+        for k in keys:
+            lru_ttl.get_or_compute(k, lambda: k)
+
+    @functools.lru_cache(maxsize=CAPACITY)
+    def cached(k):
+        return k
+    def functools_worker(keys):
+        for k in keys:
+            cached(k)
+
+    od = LockedOrderedDict(CAPACITY)
+    def od_worker(keys):
+        for i, k in enumerate(keys):
+            if i % 10 == 0:
+                od.put(k, k)
+            else:
+                od.get(k)
+
+    run('dsa.LRUCache get/put', lru_worker, ops, threads)
+    run('dsa.LRUCache get_or_compute', lru_compute_worker, ops, threads)
+    run('functools.lru_cache', functools_worker, ops, threads)
+    run('OrderedDict + Lock', od_worker, ops, threads)
+    print(f"dsa.LRUCache stats: {lru_ttl.stats()}")
@@ -0,0 +1,50 @@
+"""
+Throughput of the pest CNN micro-batcher against max batch size.
+
+Run from the backend directory (needs TensorFlow and cnn_model.keras):
+    python -m benchmarks.bench_pest_batching [requests] [concurrency]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml_models.micro_batcher import MicroBatcher
+from ml_models.pest_disease_model import PestDiseaseModel
+
+
+def run(model, max_batch_size, requests, concurrency, images):
+    if max_batch_size == 1:
+        call = lambda img: model._forward(np.expand_dims(img, 0))[0]
+        batcher = None
+    else:
+        batcher = MicroBatcher(model._forward, max_batch_size=max_batch_size, max_wait_ms=5)
+        call = batcher
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(call, (images[i % len(images)] for i in range(requests))))
+    elapsed = time.perf_counter() - start
+
+    stats = batcher.stats() if batcher else {'avg_batch_size': 1, 'avg_wait_ms': 0}
+    print(f"max_batch={max_batch_size:3d} | {requests / elapsed:8.1f} img/s | "
+          f"avg batch {stats['avg_batch_size']:5} | avg wait {stats['avg_wait_ms']} ms")
+
+
+if __name__ == '__main__':
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+
+    model = PestDiseaseModel()
+    if model.model is None:
+        sys.exit("cnn_model.keras not found; nothing to benchmark")
+
+    rng = np.random.default_rng(0)
+    images = rng.uniform(0, 255, size=(16, 160, 160, 3)).astype(np.float32)
+    model._forward(images[:1])  # warm up
+
+    for size in (1, 2, 4, 8, 16, 32):
+        run(model, size, requests, concurrency, images)
@@ -0,0 +1,51 @@
+"""
+Single-image latency of the pest CNN inference paths (keras predict,
+tf.function direct call, TFLite) on CPU, plus a parity check of the class
+probabilities against model.predict.
+
+Run from the backend directory (needs TensorFlow and cnn_model.keras):
+    python -m benchmarks.bench_pest_inference [iterations]
+"""
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml_models.pest_disease_model import PestDiseaseModel
+
+
+def latency(model, images, iterations):
+    samples = []
+    for i in range(iterations):
+        img = images[i % len(images)][None, ...]
+        start = time.perf_counter()
+        model._forward(img)
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return np.percentile(samples, 50), np.percentile(samples, 99)
+
+
+if __name__ == '__main__':
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    model = PestDiseaseModel()
+    if model.model is None:
+        sys.exit("cnn_model.keras not found; nothing to benchmark")
+
+    rng = np.random.default_rng(0)
+    images = rng.uniform(0, 255, size=(32, *model.INPUT_SIZE, 3)).astype(np.float32)
+
+    model.set_backend('keras')
+    reference = model._forward(images)
+
+    for backend in ('keras', 'function', 'tflite'):
+        if model.set_backend(backend) != backend:
+            print(f"{backend:8s} | unavailable")
+            continue
+        probs = model._forward(images)
+        max_diff = float(np.max(np.abs(probs - reference)))
+        agree = float(np.mean(np.argmax(probs, axis=1) == np.argmax(reference, axis=1))) * 100
+        p50, p99 = latency(model, images, iterations)
+        print(f"{backend:8s} | p50 {p50:7.2f} ms | p99 {p99:7.2f} ms | "
+              f"max |dp| {max_diff:.2e} | top-1 agreement {agree:.1f}%")
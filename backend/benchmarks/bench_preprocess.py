@@ -0,0 +1,88 @@
+"""
+Parity check + microbenchmark for the pandas-free feature plans.
+
+Run from the backend directory:
+    python -m benchmarks.bench_preprocess
+"""
+import os
+import random
+import sys
+import time
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from ml_models.crop_yield_model import CropYieldModel
+from ml_models.crop_recommendation_model import CropRecommendationModel
+
+
+def _yield_inputs(n):
+    districts = list(CropYieldModel.DISTRICT_MAP) + ['Unknown']
+    return [{
+        'District': random.choice(districts),
+        'Year': random.choice([2015, '2018', '1990-91']),
+        'avg_rainfall': random.uniform(50, 900),
+        'avg_temperature': random.uniform(10, 40),
+        'Crop': random.choice(CropYieldModel.CROPS + ['Barley']),
+        'soil_quality': random.choice(CropYieldModel.SOIL_QUALITIES)
+    } for _ in range(n)]
+
+
+def _recommend_inputs(n):
+    districts = list(CropRecommendationModel.DISTRICT_MAP) + ['unknown']
+    return [{
+        'N': random.randint(0, 140), 'P': random.randint(5, 145), 'K': random.randint(5, 205),
+        'temperature': random.uniform(8, 44), 'humidity': random.uniform(14, 100),
+        'ph': random.uniform(3.5, 9.9), 'rainfall': random.uniform(20, 300),
+        'district': random.choice(districts).upper()
+    } for _ in range(n)]
+
+
+def _standard_scalers(inputs, cols):
+    # Every with_mean/with_std combination, fitted on the yield inputs, to check
+    # that the plan applies only the parts transform() applies
+    data = pd.DataFrame(inputs)[cols]
+    return {f'with_mean={m},with_std={s}': StandardScaler(with_mean=m, with_std=s).fit(data)
+            for m in (True, False) for s in (True, False)}
+
+
+def _time_per_call(fn, inputs):
+    start = time.perf_counter()
+    for item in inputs:
+        fn(item)
+    return (time.perf_counter() - start) / len(inputs) * 1e6
+
+
+def run(model, scaler, inputs, label):
+    model.plan = None
+    slow = [model.preprocess(i, scaler)[model.selected_features].to_numpy(dtype=np.float64) for i in inputs]
+    model.compile_plan(scaler)
+    if model.plan is None:
+        print(f"{label}: scaler not supported by FeaturePlan, skipping")
+        return
+    fast = [model.preprocess_fast(i).copy() for i in inputs]
+
+    mismatches = sum(not np.array_equal(a, b) for a, b in zip(slow, fast))
+    print(f"{label}: parity {len(inputs) - mismatches}/{len(inputs)} rows bit-identical")
+
+    slow_us = _time_per_call(lambda i: model.preprocess(i, scaler), inputs)
+    fast_us = _time_per_call(model.preprocess_fast, inputs)
+    print(f"{label}: DataFrame path {slow_us:8.1f} us/row | feature plan {fast_us:6.1f} us/row "
+          f"| {slow_us / fast_us:5.1f}x faster")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    random.seed(7)
+    yield_scaler = joblib.load(os.path.join(Config.MODEL_PATH, 'crop_yeild_scaler.joblib'))
+    recommend_scaler = joblib.load(os.path.join(Config.MODEL_PATH, 'crop_recomend_minmax_scaler.joblib'))
+    yield_inputs = _yield_inputs(2000)
+    run(CropYieldModel(), yield_scaler, yield_inputs, 'yield')
+    for name, scaler in _standard_scalers(yield_inputs, CropYieldModel.SCALE_COLS).items():
+        run(CropYieldModel(), scaler, yield_inputs[:200], f'yield StandardScaler({name})')
+    run(CropRecommendationModel(), recommend_scaler, _recommend_inputs(2000), 'recommendation')
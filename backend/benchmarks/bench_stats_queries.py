@@ -0,0 +1,85 @@
+"""
+Admin/dashboard stats: the old one-COUNT-per-figure queries against the
+single aggregate queries in services/stats_service.py, on a seeded SQLite
+database, with and without the refresh interval.
+
+Run from the backend directory:
+    python -m benchmarks.bench_stats_queries [users] [predictions] [iterations]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_db_file = os.path.join(tempfile.mkdtemp(), 'bench_stats.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_file}'
+os.environ.setdefault('MODEL_LOAD_MODE', 'lazy')
+
+from app import app
+from models import db, User, Farm, Prediction
+from services.stats_service import StatsService
+
+
+def _seed(users, predictions):
+    with app.app_context():
+        db.create_all()
+        db.session.bulk_insert_mappings(User, [
+            {'name': f'User {i}', 'email': f'user{i}@agri.com', 'password_hash': 'x', 'role': 'user',
+             'status': 'active' if i % 10 else 'inactive'}
+            for i in range(users)
+        ])
+        db.session.bulk_insert_mappings(Farm, [
+            {'user_id': random.randint(1, users), 'name': f'Farm {i}', 'location': 'Multan', 'size_acres': 10.0}
+            for i in range(users * 2)
+        ])
+        db.session.bulk_insert_mappings(Prediction, [
+            {'user_id': random.randint(1, users), 'prediction_type': 'yield',
+             'input_data': '{}', 'result_data': '{}'}
+            for _ in range(predictions)
+        ])
+        db.session.commit()
+
+
+def old_admin():
+    return (User.query.count(), User.query.filter_by(status='active').count(),
+            User.query.filter_by(status='inactive').count())
+
+
+def old_dashboard(user_id):
+    if user_id is None:
+        return Farm.query.count(), User.query.count(), Prediction.query.count()
+    return (Farm.query.filter_by(user_id=user_id).count(), 1,
+            Prediction.query.filter_by(user_id=user_id).count())
+
+
+def run(label, fn, iterations):
+    with app.app_context():
+        fn()  # warm up
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        elapsed = time.perf_counter() - start
+    print(f"{label:32s} | {elapsed / iterations * 1000:8.3f} ms/call")
+
+
+if __name__ == '__main__':
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    predictions = int(sys.argv[2]) if len(sys.argv) > 2 else 200000
+    iterations = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    _seed(users, predictions)
+    print(f"{users} users, {users * 2} farms, {predictions} predictions, {iterations} calls each\n")
+
+    uncached = StatsService(refresh_interval=0)
+    cached = StatsService(refresh_interval=30)
+
+    run('admin: 3 COUNT queries', old_admin, iterations)
+    run('admin: 1 aggregate query', uncached.user_status_counts, iterations)
+    run('admin: aggregate + refresh', cached.user_status_counts, iterations)
+    run('dashboard(global): 3 queries', lambda: old_dashboard(None), iterations)
+    run('dashboard(global): 1 query', lambda: uncached.dashboard_counts(None), iterations)
+    run('dashboard(user): 2 queries', lambda: old_dashboard(42), iterations)
+    run('dashboard(user): 1 query', lambda: uncached.dashboard_counts(42), iterations)
+    run('dashboard(user): + refresh', lambda: cached.dashboard_counts(42), iterations)
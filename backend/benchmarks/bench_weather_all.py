@@ -0,0 +1,65 @@
+"""
+/api/weather/all upstream latency against the local stub with injected
+delay: sequential current + forecast + advisories versus
+WeatherService.get_all (concurrent fetches, advisories derived from the
+fetched current weather), plus per-call cost of a new connection
+(requests.get) versus the pooled keep-alive session.
+
+Run from the backend directory:
+    python -m benchmarks.bench_weather_all [delay_ms] [iterations]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.weather_stub import WeatherStub
+
+stub = WeatherStub().start()
+os.environ['OPENWEATHER_BASE_URL'] = stub.base_url
+os.environ.setdefault('OPENWEATHER_API_KEY', 'stub-key')
+
+import requests
+from services.http_client import http_session
+from services.weather_service import WeatherService
+
+
+def timed(label, fn, iterations):
+    samples = []
+    stub.reset()
+    for _ in range(iterations):
+        WeatherService.cache.clear()  # every iteration is a cold miss
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    p50 = samples[len(samples) // 2]
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(f"{label:38s} | p50 {p50:8.1f} ms | p99 {p99:8.1f} ms | upstream calls {stub.hits}")
+
+
+def sequential(service, location):
+    current = service.get_current_weather(location)
+    forecast = service.get_forecast(location)
+    advisories = service.get_advisories(location)
+    return {'current': current, 'forecast': forecast, 'advisories': advisories}
+
+
+if __name__ == '__main__':
+    delay_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 300
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    service = WeatherService()
+    url = f"{stub.base_url}/weather"
+    params = {'q': 'Multan', 'appid': 'stub-key', 'units': 'metric'}
+
+    stub.delay_ms = delay_ms
+    print(f"Upstream delay {delay_ms} ms, {iterations} cold iterations\n")
+    timed('sequential current/forecast/advisories', lambda: sequential(service, 'Multan'), iterations)
+    timed('get_all (concurrent)', lambda: service.get_all('Multan'), iterations)
+
+    stub.delay_ms = 0
+    print()
+    timed('requests.get (new connection)', lambda: requests.get(url, params=params, timeout=5), iterations * 10)
+    timed('pooled session (keep-alive)', lambda: http_session.get(url, params=params, timeout=5), iterations * 10)
+    stub.stop()
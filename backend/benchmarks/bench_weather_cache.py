@@ -0,0 +1,51 @@
+"""
+Weather cache behaviour against the local stub: concurrent misses for one
+location (in different spellings) coalesce into a single upstream call,
+repeat reads are served from cache, and expired entries are served stale
+while one background refresh runs.
+
+Run from the backend directory:
+    python -m benchmarks.bench_weather_cache [threads]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.weather_stub import WeatherStub
+
+stub = WeatherStub(delay_ms=200).start()
+os.environ['OPENWEATHER_BASE_URL'] = stub.base_url
+os.environ.setdefault('OPENWEATHER_API_KEY', 'stub-key')
+os.environ['WEATHER_CURRENT_TTL'] = '1'
+os.environ['WEATHER_FORECAST_TTL'] = '1'
+
+from services.weather_service import WeatherService
+
+SPELLINGS = ['Multan', 'multan', ' MULTAN ', 'Multan  ']
+
+
+def burst(service, threads, label):
+    stub.reset()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(lambda i: (service.get_current_weather(SPELLINGS[i % len(SPELLINGS)]),
+                                 service.get_forecast(SPELLINGS[i % len(SPELLINGS)])), range(threads)))
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{label:34s} | {elapsed:8.1f} ms | upstream calls {stub.hits}")
+
+
+if __name__ == '__main__':
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    service = WeatherService()
+
+    burst(service, threads, f'{threads} concurrent cold misses')
+    burst(service, threads, f'{threads} concurrent warm reads')
+    time.sleep(1.2)
+    burst(service, threads, 'after TTL: served stale')
+    time.sleep(0.5)
+    burst(service, threads, 'after background refresh')
+    print(f"\ncache {service.cache.stats()}")
+    stub.stop()
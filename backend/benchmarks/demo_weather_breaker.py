@@ -0,0 +1,62 @@
+"""
+Weather client behaviour against the fault-injecting stub: healthy, then
+every request failing with 503, then hanging (client timeouts), then
+recovered. For each phase prints request latency, upstream calls and the
+circuit breaker state. The cache is cleared before every request so each
+one is a miss; once the breaker opens, misses fall back to mock data
+without waiting on the upstream.
+
+Run from the backend directory:
+    python -m benchmarks.demo_weather_breaker [requests_per_phase]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.weather_stub import WeatherStub
+
+stub = WeatherStub(delay_ms=20).start()
+os.environ['OPENWEATHER_BASE_URL'] = stub.base_url
+os.environ.setdefault('OPENWEATHER_API_KEY', 'stub-key')
+os.environ['WEATHER_TIMEOUT'] = '1'
+os.environ['WEATHER_RETRIES'] = '2'
+os.environ['WEATHER_BREAKER_FAILURES'] = '3'
+os.environ['WEATHER_BREAKER_RESET'] = '3'
+
+from services.weather_service import WeatherService, weather_client
+
+
+def phase(label, service, requests):
+    stub.reset()
+    samples = []
+    for i in range(requests):
+        service.cache.clear()
+        start = time.perf_counter()
+        service.get_current_weather(f'City {i % 3}')
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    breaker = weather_client.stats()['breaker']
+    print(f"{label:22s} | p50 {samples[len(samples) // 2]:7.1f} ms | max {samples[-1]:7.1f} ms | "
+          f"upstream calls {stub.total_hits:3d} | breaker {breaker['state']:9s} "
+          f"(opened {breaker['times_opened']}, rejected {breaker['rejected_calls']})")
+
+
+if __name__ == '__main__':
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    service = WeatherService()
+
+    phase('healthy', service, requests)
+    stub.fail_rate = 1.0
+    phase('upstream 503s', service, requests)
+    stub.fail_rate, stub.hang = 0.0, True
+    time.sleep(3.5)  # past the breaker reset timeout: next call is the half-open trial
+    phase('upstream hanging', service, requests)
+    stub.hang = False
+    time.sleep(3.5)
+    phase('recovered', service, requests)
+
+    print(f"\nupstream {weather_client.stats()}")
+    print(f"cache {service.cache.stats()}")
+    stub.stop()
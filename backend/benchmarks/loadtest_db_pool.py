@@ -0,0 +1,106 @@
+"""
+Load test for the SQLAlchemy connection pool settings: runs the same
+bursty, multi-threaded /api/predict/history workload under several
+DB_POOL_* profiles (one subprocess each, since engine options are read at
+startup) and reports throughput, p50/p99 latency and pool metrics.
+
+Uses a throwaway SQLite file unless BENCH_DATABASE_URL points at a local
+MySQL database.
+
+Run from the backend directory:
+    python -m benchmarks.loadtest_db_pool [requests] [threads]
+"""
+import datetime
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+PROFILES = {
+    'tiny (2+0)': {'DB_POOL_SIZE': '2', 'DB_MAX_OVERFLOW': '0', 'DB_POOL_PRE_PING': 'False'},
+    'sqlalchemy default (5+10)': {'DB_POOL_SIZE': '5', 'DB_MAX_OVERFLOW': '10', 'DB_POOL_PRE_PING': 'False'},
+    'tuned (10+20)': {'DB_POOL_SIZE': '10', 'DB_MAX_OVERFLOW': '20', 'DB_POOL_PRE_PING': 'False'},
+    'tuned + pre-ping': {'DB_POOL_SIZE': '10', 'DB_MAX_OVERFLOW': '20', 'DB_POOL_PRE_PING': 'True'},
+}
+
+
+def worker(requests, threads):
+    import jwt
+    from app import app
+    from models import db, User, Prediction
+    from services.db_pool_monitor import pool_monitor
+
+    with app.app_context():
+        db.create_all()
+        user = User.query.filter_by(email='loadtest@agri.com').first()
+        if user is None:
+            user = User(name='Load Test', email='loadtest@agri.com', role='user', password_hash='x')
+            db.session.add(user)
+            db.session.commit()
+            db.session.bulk_insert_mappings(Prediction, [
+                {'user_id': user.id, 'prediction_type': 'yield', 'input_data': '{}', 'result_data': '{}',
+                 'created_at': datetime.datetime.utcnow() - datetime.timedelta(minutes=i)}
+                for i in range(500)
+            ])
+            db.session.commit()
+        token = jwt.encode({'user_id': user.id, 'role': 'user',
+                            'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)},
+                           app.config['JWT_SECRET_KEY'], algorithm='HS256')
+
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+
+    def call(_):
+        started = time.perf_counter()
+        resp = client.get('/api/predict/history?limit=20', headers=headers)
+        return time.perf_counter() - started, resp.status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(call, range(requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(lat for lat, _ in results)
+    pct = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000.0
+    print(json.dumps({
+        'rps': requests / elapsed,
+        'p50_ms': pct(0.50),
+        'p99_ms': pct(0.99),
+        'errors': sum(1 for _, status in results if status != 200),
+        'pool': pool_monitor.stats()
+    }))
+
+
+def run_profiles(requests, threads):
+    db_url = os.getenv('BENCH_DATABASE_URL') or \
+        f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'loadtest_pool.db')}"
+    print(f"{requests} requests, {threads} threads, {db_url.split('@')[-1]}\n")
+    for label, overrides in PROFILES.items():
+        env = dict(os.environ, DATABASE_URL=db_url, MODEL_LOAD_MODE='lazy', **overrides)
+        out = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.loadtest_db_pool', '--worker', str(requests), str(threads)],
+            cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+        )
+        if out.returncode != 0:
+            print(f"{label:26s} | failed:\n{out.stderr[-2000:]}")
+            continue
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        pool = r['pool']
+        print(f"{label:26s} | {r['rps']:8.1f} req/s | p50 {r['p50_ms']:7.2f} ms | p99 {r['p99_ms']:8.2f} ms | "
+              f"errors {r['errors']} | conns {pool['connections_opened']} | peak out {pool['peak_checked_out']} | "
+              f"overflow {pool['overflow_checkouts']} | wait p99 {pool['p99_wait_ms']} ms | timeouts {pool['timeouts']}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--worker':
+        worker(int(sys.argv[2]), int(sys.argv[3]))
+    else:
+        requests = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+        threads = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+        run_profiles(requests, threads)
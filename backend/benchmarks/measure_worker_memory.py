@@ -0,0 +1,85 @@
+"""
+Per-worker RSS/PSS/USS with and without shared (pre-fork / mmap) model loading.
+
+Forks N worker processes the way gunicorn does and reports the memory each
+one uses after loading and exercising the sklearn models. USS is the memory
+unique to a worker, i.e. what every extra worker really costs; PSS adds the
+worker's proportional share of pages it shares with the others (Linux only).
+
+    python export_mmap_models.py            # once, for the mmap scenario
+    python -m benchmarks.measure_worker_memory [workers]
+"""
+import gc
+import json
+import os
+import sys
+import psutil
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SAMPLE_RECOMMENDATION = {'N': 90, 'P': 42, 'K': 43, 'temperature': 20.8, 'humidity': 82.0,
+                         'ph': 6.5, 'rainfall': 202.9, 'district': 'multan'}
+
+
+def _load_and_exercise():
+    from ml_models.model_loader import ModelLoader
+    loader = ModelLoader()
+    loader.ensure_loaded('yield')
+    loader.ensure_loaded('recommendation')
+    if loader.recommend_model.model is not None:
+        loader.predict_recommendation(SAMPLE_RECOMMENDATION)
+
+
+def scenario(workers, preload, mmap):
+    """Run one scenario in a fresh interpreter so module state does not leak."""
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        os.environ['MODEL_MMAP'] = 'True' if mmap else 'False'
+        os.environ['MODEL_LOAD_MODE'] = 'prefork' if preload else 'lazy'
+        if preload:
+            _load_and_exercise()
+            gc.freeze()
+
+        children = []
+        for _ in range(workers):
+            r, w = os.pipe()
+            child = os.fork()
+            if child == 0:
+                os.close(r)
+                _load_and_exercise()
+                mem = psutil.Process().memory_full_info()
+                os.write(w, json.dumps({'rss': mem.rss, 'pss': getattr(mem, 'pss', 0), 'uss': mem.uss}).encode())
+                os._exit(0)
+            os.close(w)
+            children.append((child, r))
+
+        results = []
+        for child, r in children:
+            results.append(json.loads(os.read(r, 4096)))
+            os.waitpid(child, 0)
+        os.write(write_fd, json.dumps(results).encode())
+        os._exit(0)
+
+    os.close(write_fd)
+    data = b''
+    while chunk := os.read(read_fd, 65536):
+        data += chunk
+    os.waitpid(pid, 0)
+    return json.loads(data)
+
+
+if __name__ == '__main__':
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    mb = 1024 * 1024
+    for label, preload, mmap in (('per-worker load', False, False),
+                                 ('per-worker load + mmap', False, True),
+                                 ('pre-fork load', True, False),
+                                 ('pre-fork load + mmap', True, True)):
+        results = scenario(workers, preload, mmap)
+        rss = sum(r['rss'] for r in results) / len(results) / mb
+        pss = sum(r['pss'] for r in results) / len(results) / mb
+        uss = sum(r['uss'] for r in results) / len(results) / mb
+        print(f"{label:24s} | avg RSS {rss:7.1f} MB | avg PSS {pss:7.1f} MB | avg USS {uss:7.1f} MB | "
+              f"sum USS ({workers} workers) {uss * workers:7.1f} MB")
@@ -0,0 +1,74 @@
+"""
+Soak test for StatsService's cache: replays the /api/admin/stats and
+/api/dashboard/stats access pattern (the global user counts plus per-user
+dashboard counts) over simulated days and reports memory, lookup latency
+and how many aggregate queries would have run per day. The compute
+functions are stubs, so no database is needed.
+
+Run from the backend directory:
+    python -m benchmarks.soak_stats_service_cache [days] [reads_per_minute] [users]
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.stats_service import StatsService
+from utils.dsa import LRUCache, admin_stats_cache
+
+USER_COUNTS = {'total': 1200, 'active': 1100, 'inactive': 100}
+DASHBOARD_COUNTS = {'farms': 3, 'users': 1, 'predictions': 42}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def soak(service, clock, days, reads_per_minute, users):
+    computes = [0]
+
+    def compute(result):
+        def run():
+            computes[0] += 1
+            return dict(result)
+        return run
+
+    rng = random.Random(0)
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    for day in range(1, days + 1):
+        computes[0] = 0
+        start = time.perf_counter()
+        lookups = 0
+        for minute in range(1440):
+            clock.now = ((day - 1) * 1440 + minute) * 60.0
+            for _ in range(reads_per_minute):
+                # Same keys StatsService.user_status_counts / dashboard_counts use
+                service._cached('user_status', compute(USER_COUNTS))
+                service._cached(('dashboard', rng.randrange(users)), compute(DASHBOARD_COUNTS))
+                lookups += 2
+        elapsed = time.perf_counter() - start
+        mem = tracemalloc.get_traced_memory()[0] - base
+        print(f"day {day:3d} | {mem / 1024:9.1f} KiB | {len(service._cache.cache):5d} keys | "
+              f"{computes[0]:7d} queries | {elapsed / lookups * 1e6:6.2f} us/lookup")
+    tracemalloc.stop()
+
+
+if __name__ == '__main__':
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    reads = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    users = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+
+    clock = FakeClock()
+    # Same bounds as the shared admin_stats_cache, on the simulated clock
+    service = StatsService(cache=LRUCache(capacity=admin_stats_cache.capacity, clock=clock))
+    print(f"StatsService refresh_interval={service.refresh_interval}s, "
+          f"capacity={service._cache.capacity}, {users} users")
+    soak(service, clock, days, reads, users)
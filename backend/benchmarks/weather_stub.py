@@ -0,0 +1,106 @@
+"""
+Local stand-in for the OpenWeatherMap endpoints used by WeatherService
+(/weather and /forecast), with injectable latency and faults. Used by the
+weather benchmarks; point Config.OPENWEATHER_BASE_URL at stub.base_url.
+
+Standalone:
+    python -m benchmarks.weather_stub [port] [delay_ms] [fail_rate]
+"""
+import json
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class WeatherStub:
+    def __init__(self, port=0, delay_ms=0.0, fail_rate=0.0, condition='Clear'):
+        self.delay_ms = delay_ms        # added to every response
+        self.fail_rate = fail_rate      # fraction of requests answered with HTTP 503
+        self.hang = False               # when True, sleep 30s (forces client timeouts)
+        self.condition = condition
+        self.hits = {}
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    @property
+    def total_hits(self):
+        with self._lock:
+            return sum(self.hits.values())
+
+    def reset(self):
+        with self._lock:
+            self.hits.clear()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name='weather-stub', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _current(self, city):
+        return {'name': city.title(), 'main': {'temp': 31.4, 'humidity': 40},
+                'weather': [{'main': self.condition}], 'wind': {'speed': 4.2}}
+
+    def _forecast(self, city):
+        start = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0)
+        return {'list': [{'dt_txt': (start + timedelta(hours=3 * i)).strftime('%Y-%m-%d %H:%M:%S'),
+                          'main': {'temp': 28.0 + i % 5}, 'weather': [{'main': self.condition}],
+                          'pop': 0.1} for i in range(40)]}
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive, so pooled clients can reuse connections
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                city = parse_qs(url.query).get('q', ['Unknown'])[0]
+                endpoint = url.path.rsplit('/', 1)[-1]
+                with stub._lock:
+                    stub.hits[endpoint] = stub.hits.get(endpoint, 0) + 1
+                if stub.hang:
+                    time.sleep(30)
+                if stub.delay_ms:
+                    time.sleep(stub.delay_ms / 1000.0)
+                if random.random() < stub.fail_rate:
+                    return self._send(503, {'message': 'injected failure'})
+                if endpoint == 'weather':
+                    return self._send(200, stub._current(city))
+                if endpoint == 'forecast':
+                    return self._send(200, stub._forecast(city))
+                return self._send(404, {'message': 'not found'})
+
+            def _send(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8099
+    stub = WeatherStub(port, float(sys.argv[2]) if len(sys.argv) > 2 else 0.0,
+                       float(sys.argv[3]) if len(sys.argv) > 3 else 0.0)
+    print(f"Weather stub on {stub.base_url} (OPENWEATHER_BASE_URL={stub.base_url})")
+    stub.server.serve_forever()
@@ -0,0 +1,33 @@
+"""
+Re-dump the sklearn joblib artifacts uncompressed into ml_models/models/mmap
+so they can be loaded with joblib.load(mmap_mode='r') (set MODEL_MMAP=True).
+
+    python export_mmap_models.py
+"""
+import os
+import joblib
+from config import Config
+from ml_models.artifacts import MMAP_DIR, mmap_path
+
+ARTIFACTS = [
+    'crop_yeild_prediction.joblib',
+    'crop_yeild_scaler.joblib',
+    'crop_recomend_model.joblib',
+    'crop_recomend_minmax_scaler.joblib',
+    'crop_recomend_label_encoder.joblib',
+]
+
+def export_all():
+    os.makedirs(MMAP_DIR, exist_ok=True)
+    for name in ARTIFACTS:
+        src = os.path.join(Config.MODEL_PATH, name)
+        if not os.path.exists(src):
+            print(f"Skipping {name} (not found)")
+            continue
+        obj = joblib.load(src)
+        # compress=0 keeps numpy arrays as raw, page-aligned buffers that can be mmapped
+        joblib.dump(obj, mmap_path(src), compress=0)
+        print(f"Exported {name} -> {mmap_path(src)}")
+
+if __name__ == "__main__":
+    export_all()
@@ -0,0 +1,30 @@
+# Gunicorn settings for multi-worker deployments:
+#     gunicorn -c gunicorn.conf.py app:app
+import gc
+import os
+import tempfile
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', '4'))
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+
+# Import the app (and load the sklearn models) once in the master so the
+# workers share those pages copy-on-write instead of each holding a copy.
+preload_app = True
+os.environ.setdefault('MODEL_LOAD_MODE', 'prefork')
+# One weather prefetcher per host (file lock), sharing its results with every
+# worker through a SQLite weather cache
+os.environ.setdefault('WEATHER_PREFETCH_LOCK', os.path.join(tempfile.gettempdir(), 'weather_prefetch.lock'))
+os.environ.setdefault('WEATHER_CACHE_SQLITE_PATH', os.path.join(tempfile.gettempdir(), 'weather_cache.sqlite3'))
+
+
+def pre_fork(server, worker):
+    # Move everything allocated so far out of the GC's reach; otherwise the
+    # first collection in a worker touches every object and un-shares the pages.
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # TensorFlow (pest model) and anything not loaded in the master
+    from ml_models.model_loader import ModelLoader
+    ModelLoader().preload()
@@ -1,7 +1,121 @@
 from functools import wraps
 from flask import request, jsonify, current_app, g
+import hashlib
+import time
 import jwt
+from config import Config
 from models import User
+from utils.dsa import LRUCache
+
+class UserSnapshot:
+    """
+    Read-only copy of a User row, used as g.current_user. It is detached
+    from any DB session, so it can be cached and shared across requests.
+    """
+    __slots__ = ('_data',)
+
+    def __init__(self, user):
+        object.__setattr__(self, '_data', user.to_dict())
+
+    def __getattr__(self, name):
+        try:
+            return self._data[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name, value):
+        raise AttributeError('UserSnapshot is read-only')
+
+    def to_dict(self):
+        return dict(self._data)
+
+class UserCache:
+    """Per-process cache of user_id -> UserSnapshot with a short TTL."""
+
+    def __init__(self, ttl=30, capacity=10000):
+        self._cache = LRUCache(capacity=capacity, ttl=ttl)
+
+    @property
+    def ttl(self):
+        return self._cache.ttl
+
+    @ttl.setter
+    def ttl(self, value):
+        self._cache.ttl = value
+
+    @staticmethod
+    def _load(user_id):
+        user = User.query.get(user_id)
+        return UserSnapshot(user) if user else None
+
+    def get(self, user_id):
+        if not self.ttl or self.ttl <= 0:
+            return self._load(user_id)
+        # Unknown users return None and are not cached
+        return self._cache.get_or_compute(user_id, lambda: self._load(user_id))
+
+    def invalidate(self, user_id):
+        # Also stops a load already in flight from caching its pre-change snapshot
+        self._cache.delete(user_id)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        return self._cache.stats()
+
+user_cache = UserCache(ttl=Config.USER_CACHE_TTL)
+
+class TokenCache:
+    """
+    Bounded LRU cache of verified JWTs: sha256(secret, token) -> decoded claims.
+    A hit skips the HMAC check and JSON parsing. Entries are dropped at the
+    token's own `exp`, so an expired token is never served from the cache.
+    Only successfully verified tokens are cached.
+    """
+
+    def __init__(self, capacity=10000):
+        self._cache = LRUCache(capacity=capacity)
+
+    @staticmethod
+    def _digest(token, secret):
+        return hashlib.sha256(secret.encode() + b'\x00' + token.encode()).digest()
+
+    def decode(self, token, secret):
+        key = self._digest(token, secret)
+        claims = self._cache.get(key)
+        if claims is not None:
+            return claims
+
+        # Raises jwt.ExpiredSignatureError / jwt.InvalidTokenError like before
+        claims = jwt.decode(token, secret, algorithms=["HS256"])
+        if 'exp' in claims:
+            self._cache.put(key, claims, ttl=float(claims['exp']) - time.time())
+        return claims
+
+    def stats(self):
+        return self._cache.stats()
+
+token_cache = TokenCache(capacity=Config.TOKEN_CACHE_SIZE)
+
+def decode_token(token):
+    """jwt.decode with the app secret, memoized by token_cache."""
+    return token_cache.decode(token, current_app.config['JWT_SECRET_KEY'])
+
+def get_optional_user_id():
+    """user_id from a valid Bearer token, or None for anonymous/invalid requests."""
+    auth_header = request.headers.get('Authorization')
+    if not auth_header:
+        return None
+    try:
+        return decode_token(auth_header.split(" ")[1])['user_id']
+    except Exception:
+        # Token invalid or expired, proceed as anonymous
+        return None
+
+def invalidate_user(user_id):
+    """Call after any change to a user's row (profile, role, status, deletion)."""
+    user_cache.invalidate(user_id)
 
 def token_required(f):
     @wraps(f)
@@ -19,8 +133,8 @@ def token_required(f):
             return jsonify({'message': 'Token is missing!'}), 401
         
         try:
-            data = jwt.decode(token, current_app.config['JWT_SECRET_KEY'], algorithms=["HS256"])
-            current_user = User.query.get(data['user_id'])
+            data = decode_token(token)
+            current_user = user_cache.get(data['user_id'])
             if not current_user:
                  return jsonify({'message': 'User not found!'}), 401
             g.current_user = current_user
@@ -0,0 +1,41 @@
+"""
+Create the composite indexes declared in models.py (__table_args__) on an
+existing SQLite/MySQL database. db.create_all() only creates missing
+tables, so databases created before the indexes were added need this once.
+Indexes that already exist are left alone, so it is safe to re-run.
+Indexes on columns the table does not have yet (added by the column
+migrations) are skipped and reported; run those migrations first.
+
+    python migrate_indexes.py
+"""
+from sqlalchemy import inspect
+from app import app
+from models import db
+
+
+def migrate_indexes():
+    with app.app_context():
+        inspector = inspect(db.engine)
+        existing_tables = set(inspector.get_table_names())
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables or not table.indexes:
+                continue
+            existing = {ix['name'] for ix in inspector.get_indexes(table.name)}
+            columns = {col['name'] for col in inspector.get_columns(table.name)}
+            for index in sorted(table.indexes, key=lambda ix: ix.name):
+                if index.name in existing:
+                    print(f"{table.name}.{index.name}: already present")
+                    continue
+                missing = [col.name for col in index.columns if col.name not in columns]
+                if missing:
+                    print(f"{table.name}.{index.name}: skipped, missing column(s) "
+                          f"{', '.join(missing)} (run the column migrations first)")
+                    continue
+                cols = ', '.join(col.name for col in index.columns)
+                print(f"{table.name}.{index.name} ({cols}): creating...")
+                index.create(bind=db.engine)
+        print("Index migration complete.")
+
+
+if __name__ == "__main__":
+    migrate_indexes()
@@ -0,0 +1,31 @@
+"""
+Add the dedup_key column used to deduplicate weather alert notifications
+to an existing notifications table, then create its unique index (and any
+other missing indexes, see migrate_indexes.py). Existing rows keep a NULL
+key, which the unique index allows. Safe to re-run.
+
+    python migrate_notification_dedup.py
+"""
+from sqlalchemy import inspect, text
+from app import app
+from models import db, Notification
+from migrate_indexes import migrate_indexes
+
+
+def add_dedup_column():
+    table = Notification.__table__
+    existing = {col['name'] for col in inspect(db.engine).get_columns(table.name)}
+    if 'dedup_key' in existing:
+        print("notifications.dedup_key: already present")
+        return
+    col_type = table.c.dedup_key.type.compile(dialect=db.engine.dialect)
+    print(f"notifications.dedup_key: adding {col_type} column")
+    with db.engine.begin() as conn:
+        conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN dedup_key {col_type} NULL'))
+
+
+if __name__ == "__main__":
+    with app.app_context():
+        add_dedup_column()
+    migrate_indexes()
+    print("Notification dedup migration complete.")
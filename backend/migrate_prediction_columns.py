@@ -0,0 +1,67 @@
+"""
+Add the structured prediction columns (predicted_yield, confidence, crop,
+district, recommended_crop, pest_name) to an existing predictions table and
+backfill them from the input_data/result_data JSON of existing rows, then
+create any missing indexes (see migrate_indexes.py). Safe to re-run.
+
+    python migrate_prediction_columns.py [batch_size]
+"""
+import json
+import sys
+from sqlalchemy import inspect, text
+from app import app
+from models import db, Prediction
+from migrate_indexes import migrate_indexes
+
+
+def add_columns():
+    table = Prediction.__table__
+    existing = {col['name'] for col in inspect(db.engine).get_columns(table.name)}
+    for name in Prediction.STRUCTURED_FIELDS:
+        if name in existing:
+            continue
+        col_type = table.c[name].type.compile(dialect=db.engine.dialect)
+        print(f"predictions.{name}: adding {col_type} column")
+        with db.engine.begin() as conn:
+            conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {name} {col_type} NULL'))
+
+
+def _decode(blob):
+    try:
+        return json.loads(blob) if blob else {}
+    except ValueError:
+        return {}
+
+
+def backfill(batch_size=1000):
+    # Rows saved before this migration have all structured columns NULL
+    pending = db.and_(*(getattr(Prediction, f).is_(None) for f in Prediction.STRUCTURED_FIELDS))
+    last_id, updated = 0, 0
+    while True:
+        rows = db.session.query(Prediction.id, Prediction.prediction_type,
+                                Prediction.input_data, Prediction.result_data) \
+            .filter(Prediction.id > last_id, pending) \
+            .order_by(Prediction.id).limit(batch_size).all()
+        if not rows:
+            break
+        mappings = []
+        for pred_id, p_type, input_data, result_data in rows:
+            fields = Prediction.structured_fields(p_type, _decode(input_data), _decode(result_data))
+            if any(v is not None for v in fields.values()):
+                mappings.append({'id': pred_id, **fields})
+        if mappings:
+            db.session.bulk_update_mappings(Prediction, mappings)
+        db.session.commit()
+        last_id = rows[-1][0]
+        updated += len(mappings)
+        print(f"Backfilled {updated} rows (up to id {last_id})")
+    return updated
+
+
+if __name__ == "__main__":
+    batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    with app.app_context():
+        add_columns()
+        backfill(batch_size)
+    migrate_indexes()
+    print("Prediction column migration complete.")
@@ -0,0 +1,31 @@
+import os
+import joblib
+from config import Config
+
+# Uncompressed copies of the joblib artifacts that can be memory-mapped.
+# Written by export_mmap_models.py.
+MMAP_DIR = os.path.join(Config.MODEL_PATH, 'mmap')
+
+
+def mmap_path(path):
+    return os.path.join(MMAP_DIR, os.path.basename(path))
+
+
+def load_artifact(path):
+    """
+    joblib.load with optional memory-mapping. With MODEL_MMAP on and an
+    uncompressed copy present, numpy arrays stored as plain estimator
+    attributes (scaler min_/scale_, encoder classes_, linear coef_) are
+    mapped read-only from the page cache and shared by every worker.
+
+    Tree models do not benefit: sklearn's Tree.__setstate__ copies the node
+    and value arrays into its own buffers, so a random forest is private to
+    whichever process unpickled it. Those are shared only by loading them
+    before the fork (MODEL_LOAD_MODE=prefork, see gunicorn.conf.py).
+    """
+    if Config.MODEL_MMAP:
+        mapped = mmap_path(path)
+        if os.path.exists(mapped) and os.path.getmtime(mapped) >= os.path.getmtime(path):
+            return joblib.load(mapped, mmap_mode='r')
+        print(f"No up-to-date mmap copy of {os.path.basename(path)}, loading normally")
+    return joblib.load(path)
@@ -1,7 +1,8 @@
 import os
-import joblib
 import pandas as pd
 import numpy as np
+from ml_models.feature_plan import FeaturePlan
+from ml_models.artifacts import load_artifact
 
 class CropRecommendationModel:
     # Feature order as per notebook training:
@@ -28,12 +29,15 @@ class CropRecommendationModel:
         'chakwall': 22/2200, 'jehlum': 22/2200, 'khushab': 22/2200
     }
 
+    SCALE_COLS = ['N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall']
+
     def __init__(self):
         self.model = None
+        self.plan = None
 
     def load(self, path):
         if os.path.exists(path):
-            self.model = joblib.load(path)
+            self.model = load_artifact(path)
             print(f"Recommendation model loaded successfully from {path}")
             return True
         return False
@@ -61,21 +65,45 @@ class CropRecommendationModel:
         df['district'] = self.DISTRICT_MAP.get(dist, 0.0)
 
         # 2. Scaling
-        scale_cols = ['N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall']
-        df[scale_cols] = scaler.transform(df[scale_cols])
+        df[self.SCALE_COLS] = scaler.transform(df[self.SCALE_COLS])
 
         # Ensure correct column order
         df = df[self.selected_features]
         return df
 
+    def compile_plan(self, scaler):
+        """Build the pandas-free feature plan; falls back to preprocess() on failure."""
+        try:
+            self.plan = FeaturePlan(self.selected_features, self.SCALE_COLS, scaler)
+        except Exception as e:
+            print(f"Recommendation feature plan unavailable, using DataFrame path: {e}")
+            self.plan = None
+        return self.plan
+
+    def preprocess_fast(self, input_data):
+        """Same features as preprocess(), written straight into a float64 row."""
+        plan = self.plan
+        row = plan.row()
+        dist = input_data.get('district', '').lower().strip()
+        row[0, plan.index['district']] = self.DISTRICT_MAP.get(dist, 0.0)
+        plan.scale_into(row, {col: float(input_data[col]) for col in self.SCALE_COLS})
+        return row
+
+    def cache_key(self, input_data, precision):
+        """Canonical, hashable form of the inputs that affect the prediction."""
+        district = input_data.get('district', '').lower().strip()
+        return (district,) + tuple(round(float(input_data[col]), precision) for col in self.SCALE_COLS)
+
     def predict(self, input_data, scaler, label_encoder):
         if self.model is None:
             raise ValueError("Model not loaded")
         if label_encoder is None:
             raise ValueError("Label Encoder not loaded")
             
-        df = self.preprocess(input_data, scaler)
-        pred_numeric = self.model.predict(df)[0]
+        if self.plan is not None:
+            pred_numeric = self.model.predict(self.preprocess_fast(input_data))[0]
+        else:
+            pred_numeric = self.model.predict(self.preprocess(input_data, scaler))[0]
         
         # Inverse transform to get crop name
         crop_name = label_encoder.inverse_transform([pred_numeric])[0]
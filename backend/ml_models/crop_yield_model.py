@@ -1,6 +1,8 @@
 import pandas as pd
-import joblib
+import numpy as np
 import os
+from ml_models.feature_plan import FeaturePlan
+from ml_models.artifacts import load_artifact
 
 class CropYieldModel:
     # Feature order as per notebook training
@@ -28,12 +30,17 @@ class CropYieldModel:
         'T.T.Singh': 32/5568, 'Nankana Sahib': 32/5568, 'Rahim Yar Khan': 32/5568
     }
 
+    CROPS = ['Cotton', 'Maize', 'Rice', 'Sugarcane', 'Wheat']
+    SOIL_QUALITIES = ['Good', 'Moderate', 'Poor']
+    SCALE_COLS = ['avg_rainfall', 'avg_temperature']
+
     def __init__(self):
         self.model = None
+        self.plan = None
 
     def load(self, path):
         if os.path.exists(path):
-            self.model = joblib.load(path)
+            self.model = load_artifact(path)
             print(f"Yield model loaded successfully from {path}")
             return True
         return False
@@ -65,16 +72,13 @@ class CropYieldModel:
         df['District'] = self.DISTRICT_MAP.get(district, 0.0)
 
         # 3. Scaling (Rainfall and Temperature)
-        scale_cols = ['avg_rainfall', 'avg_temperature']
-        df[scale_cols] = scaler.transform(df[scale_cols])
+        df[self.SCALE_COLS] = scaler.transform(df[self.SCALE_COLS])
 
         # 4. One-Hot Encoding (Manual for consistency with notebook head())
-        crops = ['Cotton', 'Maize', 'Rice', 'Sugarcane', 'Wheat']
-        for crop in crops:
+        for crop in self.CROPS:
             df[f'Crop_{crop}'] = 1.0 if input_data.get('Crop') == crop else 0.0
             
-        qualities = ['Good', 'Moderate', 'Poor']
-        for q in qualities:
+        for q in self.SOIL_QUALITIES:
             df[f'soil_quality_{q}'] = 1.0 if input_data.get('soil_quality') == q else 0.0
 
         # Ensure all columns present and in order
@@ -85,8 +89,143 @@ class CropYieldModel:
         df = df[self.selected_features]
         return df
 
+    def compile_plan(self, scaler):
+        """Build the pandas-free feature plan; falls back to preprocess() on failure."""
+        try:
+            self.plan = FeaturePlan(self.selected_features, self.SCALE_COLS, scaler)
+        except Exception as e:
+            print(f"Yield feature plan unavailable, using DataFrame path: {e}")
+            self.plan = None
+        return self.plan
+
+    def preprocess_fast(self, input_data):
+        """Same features as preprocess(), written straight into a float64 row."""
+        plan = self.plan
+        row = plan.row()
+        row[0, plan.index['District']] = self.DISTRICT_MAP.get(input_data['District'], 0.0)
+        row[0, plan.index['Year']] = self._parse_year(input_data['Year'])
+        plan.scale_into(row, {
+            'avg_rainfall': float(input_data['avg_rainfall']),
+            'avg_temperature': float(input_data['avg_temperature'])
+        })
+
+        crop_col = plan.index.get(f"Crop_{input_data.get('Crop')}")
+        if crop_col is not None:
+            row[0, crop_col] = 1.0
+        soil_col = plan.index.get(f"soil_quality_{input_data.get('soil_quality')}")
+        if soil_col is not None:
+            row[0, soil_col] = 1.0
+        return row
+
     def predict(self, input_data, scaler):
         if self.model is None:
             raise ValueError("Model not loaded")
+        if self.plan is not None:
+            return self.model.predict(self.preprocess_fast(input_data))[0]
         df = self.preprocess(input_data, scaler)
         return self.model.predict(df)[0]
+
+    @staticmethod
+    def _parse_year(year):
+        # Same rule as preprocess(): '1990-91' -> 1990
+        if isinstance(year, str) and '-' in year:
+            return int(year.split('-')[0])
+        return int(year)
+
+    def cache_key(self, input_data, precision):
+        """
+        Canonical, hashable form of the inputs that affect the prediction.
+        District/Crop/soil_quality lookups are exact-match in preprocess(),
+        so only numbers are normalized (year parsing, rounding).
+        """
+        return (
+            input_data['District'],
+            self._parse_year(input_data['Year']),
+            round(float(input_data['avg_rainfall']), precision),
+            round(float(input_data['avg_temperature']), precision),
+            input_data.get('Crop'),
+            input_data.get('soil_quality')
+        )
+
+    def build_feature_matrix(self, rows, scaler):
+        """
+        Vectorized version of preprocess() for many rows at once.
+        Returns (X, valid_idx, errors): X holds one feature row per valid
+        input, valid_idx gives the input index of each X row and errors maps
+        input index -> error message for rows that failed validation.
+        """
+        if scaler is None and self.plan is None:
+            raise ValueError("Scaler not loaded")
+
+        valid_idx, districts, years, rainfall, temperature = [], [], [], [], []
+        crops, soils = [], []
+        errors = {}
+        for i, row in enumerate(rows):
+            try:
+                if not isinstance(row, dict):
+                    raise ValueError("Row must be an object")
+                district = self.DISTRICT_MAP.get(row['District'], 0.0)
+                year = self._parse_year(row['Year'])
+                rain = float(row['avg_rainfall'])
+                temp = float(row['avg_temperature'])
+            except KeyError as e:
+                errors[i] = f"Missing field: {e.args[0]}"
+                continue
+            except (TypeError, ValueError) as e:
+                errors[i] = f"Invalid value: {e}"
+                continue
+            valid_idx.append(i)
+            districts.append(district)
+            years.append(year)
+            rainfall.append(rain)
+            temperature.append(temp)
+            crops.append(row.get('Crop'))
+            soils.append(row.get('soil_quality'))
+
+        n = len(valid_idx)
+        cols = {name: i for i, name in enumerate(self.selected_features)}
+        X = np.zeros((n, len(self.selected_features)), dtype=np.float64)
+        if n == 0:
+            return X, valid_idx, errors
+
+        X[:, cols['District']] = districts
+        X[:, cols['Year']] = years
+
+        # Scale rainfall/temperature in a single pass
+        weather = {'avg_rainfall': rainfall, 'avg_temperature': temperature}
+        if self.plan is not None:
+            self.plan.scale_into(X, weather)
+        else:
+            scaled = scaler.transform(pd.DataFrame(weather)[self.SCALE_COLS])
+            X[:, cols['avg_rainfall']] = scaled[:, 0]
+            X[:, cols['avg_temperature']] = scaled[:, 1]
+
+        # One-hot columns: unknown categories stay all-zero like preprocess()
+        rows_idx = np.arange(n)
+        for prefix, values, categories in (('Crop', crops, self.CROPS),
+                                           ('soil_quality', soils, self.SOIL_QUALITIES)):
+            lookup = {c: cols[f'{prefix}_{c}'] for c in categories}
+            col_idx = np.array([lookup.get(v, -1) for v in values])
+            hit = col_idx >= 0
+            X[rows_idx[hit], col_idx[hit]] = 1.0
+
+        return X, valid_idx, errors
+
+    def predict_batch(self, rows, scaler):
+        """
+        Predict yield for a list of input dicts with a single estimator call.
+        Returns one entry per input row, in input order: either
+        {'predicted_yield': float} or {'error': str}.
+        """
+        if self.model is None:
+            raise ValueError("Model not loaded")
+        X, valid_idx, errors = self.build_feature_matrix(rows, scaler)
+
+        results = [None] * len(rows)
+        for i, msg in errors.items():
+            results[i] = {'error': msg}
+        if valid_idx:
+            preds = self.model.predict(X)
+            for i, value in zip(valid_idx, preds):
+                results[i] = {'predicted_yield': float(value)}
+        return results
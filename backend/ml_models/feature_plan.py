@@ -0,0 +1,83 @@
+import threading
+import warnings
+import numpy as np
+
+# The fast path hands plain float64 arrays to estimators that were fitted on
+# DataFrames; the values and column order are identical, so sklearn's name
+# check warning is just noise on every request. Installed once (catch_warnings
+# per call is not thread-safe) and scoped to that sklearn UserWarning only.
+warnings.filterwarnings('ignore', message='X does not have valid feature names',
+                        category=UserWarning, module='sklearn')
+
+
+class FeaturePlan:
+    """
+    Compiled preprocessing plan for a fixed feature layout.
+
+    Built once at load time from a model's selected_features and its fitted
+    scaler. Column positions are resolved up front and the scaler's
+    min_/scale_ (MinMaxScaler) or mean_/scale_ (StandardScaler) parameters
+    are copied out, so a request only has to fill a float64 row.
+    """
+
+    def __init__(self, features, scale_cols, scaler):
+        self.features = list(features)
+        self.index = {name: i for i, name in enumerate(self.features)}
+
+        # Respect the column order the scaler was fitted with, if recorded
+        fitted = getattr(scaler, 'feature_names_in_', None)
+        self.scale_cols = [str(c) for c in fitted] if fitted is not None else list(scale_cols)
+        if sorted(self.scale_cols) != sorted(scale_cols):
+            raise ValueError(f"Scaler was fitted on {self.scale_cols}, expected {list(scale_cols)}")
+        self.scale_idx = np.array([self.index[c] for c in self.scale_cols])
+
+        # Mirror the exact arithmetic of the scaler's transform()
+        if hasattr(scaler, 'min_') and hasattr(scaler, 'data_min_'):
+            self.kind = 'minmax'
+            self.scale = np.asarray(scaler.scale_, dtype=np.float64)
+            self.offset = np.asarray(scaler.min_, dtype=np.float64)
+            self.clip = scaler.feature_range if getattr(scaler, 'clip', False) else None
+        elif hasattr(scaler, 'mean_') or hasattr(scaler, 'var_'):
+            self.kind = 'standard'
+            # mean_ is filled even with with_mean=False; transform() only uses what the flags enable
+            mean = scaler.mean_ if getattr(scaler, 'with_mean', True) else None
+            scale = scaler.scale_ if getattr(scaler, 'with_std', True) else None
+            self.offset = np.asarray(mean, dtype=np.float64) if mean is not None else None
+            self.scale = np.asarray(scale, dtype=np.float64) if scale is not None else None
+            self.clip = None
+        else:
+            raise ValueError(f"Unsupported scaler type: {type(scaler).__name__}")
+
+        self._local = threading.local()
+
+    def row(self):
+        """Per-thread preallocated (1, n_features) buffer, zeroed."""
+        buf = getattr(self._local, 'row', None)
+        if buf is None:
+            buf = np.zeros((1, len(self.features)), dtype=np.float64)
+            self._local.row = buf
+        else:
+            buf.fill(0.0)
+        return buf
+
+    def transform(self, values):
+        """Scale an (n, len(scale_cols)) float64 array in place and return it."""
+        if self.kind == 'minmax':
+            values *= self.scale
+            values += self.offset
+            if self.clip is not None:
+                np.clip(values, self.clip[0], self.clip[1], out=values)
+        else:
+            if self.offset is not None:
+                values -= self.offset
+            if self.scale is not None:
+                values /= self.scale
+        return values
+
+    def scale_into(self, X, raw):
+        """Write scaled raw columns (dict name -> value/array) into matrix X."""
+        values = np.empty((X.shape[0], len(self.scale_cols)), dtype=np.float64)
+        for j, name in enumerate(self.scale_cols):
+            values[:, j] = raw[name]
+        X[:, self.scale_idx] = self.transform(values)
+        return X
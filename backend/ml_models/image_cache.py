@@ -0,0 +1,169 @@
+import copy
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from PIL import Image
+
+
+def sha256_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def dhash(img_array, size=8):
+    """64-bit difference hash of a (H, W, 3) image array (e.g. the 160x160 model input)."""
+    gray = np.asarray(img_array, dtype=np.float32) @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    small = Image.fromarray(gray.clip(0, 255).astype(np.uint8)).resize((size + 1, size), Image.BILINEAR)
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int(''.join('1' if b else '0' for b in bits), 2)
+
+
+class ImagePredictionCache:
+    """
+    Content-addressed cache of pest predictions.
+
+    Exact duplicates are found by SHA-256 of the uploaded bytes. Optionally
+    (max_distance >= 0), near-duplicates (re-encoded/resized copies of the
+    same photo) are found by Hamming distance between perceptual hashes of
+    the 160x160 model input. That returns another image's diagnosis, so it is
+    off by default. Entries evicted from the in-memory LRU can spill to a
+    SQLite file, where they remain reachable by exact hash; the oldest spilled
+    rows are deleted beyond spill_max_rows.
+    """
+
+    def __init__(self, capacity=512, max_distance=-1, sqlite_path=None, spill_max_rows=10000):
+        self.capacity = capacity
+        self.max_distance = max_distance
+        self.spill_max_rows = spill_max_rows
+        self._entries = OrderedDict()  # sha -> (phash, result, inference_s)
+        self._lock = threading.Lock()
+        self._db = None
+        if sqlite_path:
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False)
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS pest_cache ('
+                'sha TEXT PRIMARY KEY, phash INTEGER, result TEXT, inference_s REAL, created_at REAL)'
+            )
+            self._db.execute('CREATE INDEX IF NOT EXISTS ix_pest_cache_created ON pest_cache (created_at)')
+            self._db.commit()
+
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.spill_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.saved_inference_s = 0.0
+
+    @property
+    def enabled(self):
+        return self.capacity > 0
+
+    @property
+    def phash_enabled(self):
+        return self.enabled and self.max_distance >= 0
+
+    def _hit(self, sha, entry):
+        self._entries[sha] = entry
+        self._entries.move_to_end(sha)
+        self.saved_inference_s += entry[2]
+        return copy.deepcopy(entry[1])
+
+    def get_exact(self, sha):
+        with self._lock:
+            entry = self._entries.get(sha)
+            if entry is not None:
+                self.exact_hits += 1
+                return self._hit(sha, entry)
+            if self._db is not None:
+                row = self._db.execute(
+                    'SELECT phash, result, inference_s FROM pest_cache WHERE sha = ?', (sha,)
+                ).fetchone()
+                if row is not None:
+                    self.spill_hits += 1
+                    entry = (row[0], json.loads(row[1]), row[2])
+                    result = self._hit(sha, entry)
+                    self._evict()
+                    return result
+            return None
+
+    def get_near(self, phash, sha=None):
+        """
+        Closest cached prediction within max_distance bits, or None (counts a
+        miss). On a hit the result is also stored under sha, so repeats of the
+        same upload are exact hits and skip decoding and hashing.
+        """
+        with self._lock:
+            best, best_dist = None, self.max_distance + 1
+            for key, entry in self._entries.items():
+                dist = (entry[0] ^ phash).bit_count() if entry[0] is not None else 64
+                if dist < best_dist:
+                    best, best_dist = key, dist
+                    if dist == 0:
+                        break
+            if best is not None:
+                self.near_hits += 1
+                entry = self._entries[best]
+                result = self._hit(best, entry)
+                if sha is not None and sha not in self._entries:
+                    self._entries[sha] = (phash, copy.deepcopy(entry[1]), entry[2])
+                    self._evict()
+                return result
+            self.misses += 1
+            return None
+
+    def miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def put(self, sha, phash, result, inference_s):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[sha] = (phash, copy.deepcopy(result), inference_s)
+            self._entries.move_to_end(sha)
+            self._evict()
+
+    def _evict(self):
+        while len(self._entries) > self.capacity:
+            sha, (phash, result, inference_s) = self._entries.popitem(last=False)
+            self.evictions += 1
+            if self._db is not None:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO pest_cache VALUES (?, ?, ?, ?, ?)',
+                    (sha, phash, json.dumps(result), inference_s, time.time())
+                )
+                self._prune_spill()
+                self._db.commit()
+
+    def _prune_spill(self):
+        # Caller holds the lock; keeps the spill file at spill_max_rows, dropping the oldest
+        if self.spill_max_rows is None or self.spill_max_rows < 0:
+            return
+        excess = self._db.execute('SELECT COUNT(*) FROM pest_cache').fetchone()[0] - self.spill_max_rows
+        if excess > 0:
+            self._db.execute(
+                'DELETE FROM pest_cache WHERE sha IN '
+                '(SELECT sha FROM pest_cache ORDER BY created_at LIMIT ?)', (excess,)
+            )
+
+    def stats(self):
+        with self._lock:
+            hits = self.exact_hits + self.near_hits + self.spill_hits
+            lookups = hits + self.misses
+            spilled = self._db.execute('SELECT COUNT(*) FROM pest_cache').fetchone()[0] if self._db else 0
+            return {
+                'size': len(self._entries),
+                'capacity': self.capacity,
+                'spilled': spilled,
+                'exact_hits': self.exact_hits,
+                'near_duplicate_hits': self.near_hits,
+                'spill_hits': self.spill_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+                'inference_seconds_saved': round(self.saved_inference_s, 3)
+            }
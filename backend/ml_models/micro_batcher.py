@@ -0,0 +1,121 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+import numpy as np
+
+
+class MicroBatcher:
+    """
+    In-process micro-batching scheduler.
+
+    Callers submit single inputs and get a Future back. A worker thread
+    collects queued inputs until either max_batch_size is reached or the
+    oldest input has waited max_wait_ms, runs batch_fn once on the stacked
+    batch and hands each caller its own row of the output. Calling the
+    batcher waits at most `timeout` seconds for the result and then raises
+    TimeoutError, so a stalled or dead worker cannot hang request threads.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=8, max_wait_ms=5.0, name='micro-batcher', timeout=30.0):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._pid = None
+
+        # Metrics
+        self._batches = 0
+        self._items = 0
+        self._histogram = {}
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._errors = 0
+        self._timeouts = 0
+
+    def _ensure_worker(self):
+        # Started lazily (and restarted after a fork) so importing is side-effect free
+        if self._worker is not None and self._worker.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive() or self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._worker.start()
+
+    def submit(self, item):
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    def __call__(self, item, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            return self.submit(item).result(timeout=timeout)
+        except FutureTimeout:
+            with self._lock:
+                self._timeouts += 1
+            raise TimeoutError(f"{self.name}: no result within {timeout}s")
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = batch[0][2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            inputs = [item for item, _, _ in batch]
+            try:
+                outputs = self.batch_fn(np.stack(inputs))
+                for (_, future, _), output in zip(batch, outputs):
+                    future.set_result(output)
+            except Exception as e:
+                with self._lock:
+                    self._errors += 1
+                for _, future, _ in batch:
+                    future.set_exception(e)
+
+            with self._lock:
+                size = len(batch)
+                self._batches += 1
+                self._items += size
+                self._histogram[size] = self._histogram.get(size, 0) + 1
+                for _, _, enqueued in batch:
+                    waited = started - enqueued
+                    self._wait_total += waited
+                    self._wait_max = max(self._wait_max, waited)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000.0,
+                'queue_depth': self._queue.qsize(),
+                'batches': self._batches,
+                'items': self._items,
+                'errors': self._errors,
+                'timeouts': self._timeouts,
+                'timeout_s': self.timeout,
+                'avg_batch_size': round(self._items / self._batches, 2) if self._batches else 0,
+                'batch_size_histogram': dict(sorted(self._histogram.items())),
+                'avg_wait_ms': round(self._wait_total / self._items * 1000.0, 3) if self._items else 0,
+                'max_wait_ms_observed': round(self._wait_max * 1000.0, 3)
+            }
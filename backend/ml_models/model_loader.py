@@ -1,62 +1,217 @@
+import hashlib
 import os
-import joblib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import psutil
 from config import Config
 from ml_models.crop_yield_model import CropYieldModel
 from ml_models.crop_recommendation_model import CropRecommendationModel
-from ml_models.pest_disease_model import PestDiseaseModel
+from ml_models.artifacts import load_artifact
+from utils.dsa import LRUCache
 
 class ModelLoader:
     _instance = None
+    _instance_lock = threading.Lock()
+
+    # Independent artifact groups; each one can load on its own thread
+    GROUPS = ('yield', 'recommendation', 'pest')
+    # Load states that will not change without a restart ('missing': artifact absent)
+    FINAL_STATES = ('ready', 'failed', 'missing')
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance.yield_model = CropYieldModel()
-            cls._instance.recommend_model = CropRecommendationModel()
-            cls._instance.pest_model = PestDiseaseModel()
-            cls._instance.yield_scaler = None
-            cls._instance.recommend_scaler = None
-            cls._instance.recommend_encoder = None
-            cls._instance._load_all()
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super().__new__(cls)
+                    instance.yield_model = CropYieldModel()
+                    instance.recommend_model = CropRecommendationModel()
+                    instance.pest_model = None  # TensorFlow is only imported when this loads
+                    instance.yield_scaler = None
+                    instance.recommend_scaler = None
+                    instance.recommend_encoder = None
+                    instance._lock = threading.Lock()
+                    instance._futures = {}
+                    instance._executor = None
+                    # Keyed on canonical inputs + artifact fingerprint (see _cached)
+                    instance.prediction_cache = LRUCache(
+                        capacity=Config.PREDICTION_CACHE_SIZE,
+                        ttl=Config.PREDICTION_CACHE_TTL
+                    )
+                    instance._fingerprints = {}
+                    instance._status = {
+                        name: {'state': 'pending', 'load_time_s': None, 'artifact_bytes': None,
+                               'rss_delta_bytes': None, 'error': None}
+                        for name in cls.GROUPS
+                    }
+                    instance._start(Config.MODEL_LOAD_MODE)
+                    cls._instance = instance
         return cls._instance
 
-    def _load_all(self):
+    def _start(self, mode):
+        """
+        eager      - load everything now, in this thread (original behaviour)
+        background - start all loads concurrently and return immediately
+        lazy       - load each group on first use
+        prefork    - load the sklearn groups now, before gunicorn forks, so
+                     workers share them copy-on-write; TensorFlow is left to
+                     each worker (see gunicorn.conf.py) since it is not fork-safe
+        """
+        if mode == 'eager':
+            for name in self.GROUPS:
+                self._load_group(name)
+        elif mode == 'prefork':
+            for name in ('yield', 'recommendation'):
+                self._load_group(name)
+        elif mode == 'background':
+            for name in self.GROUPS:
+                self._submit(name)
+
+    def _submit(self, name):
+        with self._lock:
+            future = self._futures.get(name)
+            if future is None:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=len(self.GROUPS),
+                                                        thread_name_prefix='model-loader')
+                future = self._executor.submit(self._load_group, name)
+                self._futures[name] = future
+            return future
+
+    def ensure_loaded(self, name):
+        """Block until the given artifact group has finished loading."""
+        if self._status[name]['state'] in self.FINAL_STATES:
+            return
+        self._submit(name).result()
+
+    def preload(self):
+        """Kick off loading of every group that has not started yet."""
+        for name in self.GROUPS:
+            self._submit(name)
+
+    def _load_group(self, name):
+        status = self._status[name]
+        if status['state'] in self.FINAL_STATES:
+            return
+        status['state'] = 'loading'
+        rss_before = psutil.Process().memory_info().rss
+        started = time.perf_counter()
+        try:
+            expected = getattr(self, f'_load_{name}')()
+            paths = [p for p in expected if p and os.path.exists(p)]
+            status['artifact_bytes'] = sum(os.path.getsize(p) for p in paths)
+            self._fingerprints[name] = self._fingerprint(paths)
+            if self._group_model(name) is None:
+                # The loaders only warn when the artifact is absent; don't report that as ready
+                status['error'] = f"{name} model not loaded (expected at {expected[0] or 'default path'})"
+                status['state'] = 'missing'
+            else:
+                status['state'] = 'ready'
+        except Exception as e:
+            print(f"Error loading {name} models: {e}")
+            status['error'] = str(e)
+            status['state'] = 'failed'
+        finally:
+            status['load_time_s'] = round(time.perf_counter() - started, 3)
+            # Approximate when several groups load at the same time
+            status['rss_delta_bytes'] = psutil.Process().memory_info().rss - rss_before
+
+    def _load_yield(self):
         yield_model_path = os.path.join(Config.MODEL_PATH, 'crop_yeild_prediction.joblib')
         yield_scaler_path = os.path.join(Config.MODEL_PATH, 'crop_yeild_scaler.joblib')
-        
-        recommend_model_path = os.path.join(Config.MODEL_PATH, 'crop_recomend_model.joblib')
-        recommend_scaler_path = os.path.join(Config.MODEL_PATH, 'crop_recomend_minmax_scaler.joblib')
-        recommend_encoder_path = os.path.join(Config.MODEL_PATH, 'crop_recomend_label_encoder.joblib')
-        
+
         # Load Yield Model
         if not self.yield_model.load(yield_model_path):
             print(f"Warning: Yield model not found at {yield_model_path}")
 
         # Load Yield Scaler
         if os.path.exists(yield_scaler_path):
-            self.yield_scaler = joblib.load(yield_scaler_path)
+            self.yield_scaler = load_artifact(yield_scaler_path)
             print("Yield scaler loaded successfully.")
-        
+            self.yield_model.compile_plan(self.yield_scaler)
+        return [yield_model_path, yield_scaler_path]
+
+    def _load_recommendation(self):
+        recommend_model_path = os.path.join(Config.MODEL_PATH, 'crop_recomend_model.joblib')
+        recommend_scaler_path = os.path.join(Config.MODEL_PATH, 'crop_recomend_minmax_scaler.joblib')
+        recommend_encoder_path = os.path.join(Config.MODEL_PATH, 'crop_recomend_label_encoder.joblib')
+
         # Load Recommendation Model
         if not self.recommend_model.load(recommend_model_path):
             print(f"Warning: Recommendation model not found at {recommend_model_path}")
-            
+
         # Load Recommendation Scaler
         if os.path.exists(recommend_scaler_path):
-            self.recommend_scaler = joblib.load(recommend_scaler_path)
+            self.recommend_scaler = load_artifact(recommend_scaler_path)
             print("Recommendation scaler loaded successfully.")
+            self.recommend_model.compile_plan(self.recommend_scaler)
 
         # Load Recommendation Encoder
         if os.path.exists(recommend_encoder_path):
-            self.recommend_encoder = joblib.load(recommend_encoder_path)
+            self.recommend_encoder = load_artifact(recommend_encoder_path)
             print("Recommendation encoder loaded successfully.")
+        return [recommend_model_path, recommend_scaler_path, recommend_encoder_path]
+
+    def _load_pest(self):
+        from ml_models.pest_disease_model import PestDiseaseModel
+        self.pest_model = PestDiseaseModel()
+        return [self.pest_model.model_path]
+
+    def _group_model(self, name):
+        owner = {'yield': self.yield_model, 'recommendation': self.recommend_model,
+                 'pest': self.pest_model}[name]
+        return getattr(owner, 'model', None)
+
+    @staticmethod
+    def _fingerprint(paths):
+        # Identifies the artifact version; part of every prediction cache key
+        digest = hashlib.sha1()
+        for path in sorted(paths):
+            stat = os.stat(path)
+            digest.update(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        return digest.hexdigest()[:16]
+
+    def _cached(self, group, model, input_data, compute):
+        cache = self.prediction_cache
+        if cache.capacity <= 0:
+            return compute()
+        try:
+            key = (group, self._fingerprints.get(group),
+                   model.cache_key(input_data, Config.PREDICTION_CACHE_PRECISION))
+        except (KeyError, TypeError, ValueError, AttributeError):
+            # Not canonicalizable; let the model raise its usual error
+            return compute()
+        # Identical concurrent submissions run the model only once
+        return cache.get_or_compute(key, compute)
+
+    def readiness(self):
+        status = {name: dict(info) for name, info in self._status.items()}
+        return {
+            'ready': all(info['state'] == 'ready' for info in status.values()),
+            'mode': Config.MODEL_LOAD_MODE,
+            'models': status,
+            'process_rss_bytes': psutil.Process().memory_info().rss
+        }
 
     # Helper method to predict easily
     def predict_yield(self, input_data: dict):
-        return self.yield_model.predict(input_data, self.yield_scaler)
-        
+        self.ensure_loaded('yield')
+        return self._cached('yield', self.yield_model, input_data,
+                            lambda: self.yield_model.predict(input_data, self.yield_scaler))
+
+    def predict_yield_batch(self, rows: list):
+        self.ensure_loaded('yield')
+        return self.yield_model.predict_batch(rows, self.yield_scaler)
+
     def predict_recommendation(self, input_data: dict):
-        return self.recommend_model.predict(input_data, self.recommend_scaler, self.recommend_encoder)
+        self.ensure_loaded('recommendation')
+        return self._cached('recommendation', self.recommend_model, input_data,
+                            lambda: self.recommend_model.predict(input_data, self.recommend_scaler,
+                                                                 self.recommend_encoder))
 
-    def predict_pest(self, image_path: str):
-        return self.pest_model.predict(image_path)
+    def predict_pest(self, image):
+        # image: file path, raw bytes or a binary stream
+        self.ensure_loaded('pest')
+        if self.pest_model is None:
+            raise ValueError("Pest model not loaded")
+        return self.pest_model.predict(image)
@@ -1,11 +1,33 @@
 import tensorflow as tf
 import numpy as np
+import io
+import logging
 import os
+import threading
+import time
 from PIL import Image
+from config import Config
+from ml_models.micro_batcher import MicroBatcher
+from ml_models.image_cache import ImagePredictionCache, sha256_bytes, dhash
 
 class PestDiseaseModel:
+    # User confirmed model trained on (160, 160)
+    INPUT_SIZE = (160, 160)
+
     def __init__(self):
         self.model = None
+        self.batcher = None
+        self.backend = 'keras'
+        self._infer_fn = None
+        self._tflite = None
+        self._tflite_lock = threading.Lock()
+        self.model_path = None
+        self.cache = ImagePredictionCache(
+            capacity=Config.PEST_CACHE_SIZE,
+            max_distance=Config.PEST_CACHE_PHASH_DISTANCE,
+            sqlite_path=Config.PEST_CACHE_SQLITE_PATH or None,
+            spill_max_rows=Config.PEST_CACHE_SQLITE_MAX_ROWS
+        )
         # Custom classes provided by user
         self.classes = [
             'Apple___Apple_scab', 'Apple___Black_rot', 'Apple___Cedar_apple_rust', 'Apple___healthy',
@@ -29,92 +51,232 @@ class PestDiseaseModel:
         self.load(model_path)
         
     def load(self, path):
-        if os.path.exists(path):
+        if not os.path.exists(path):
+            print(f"Pest model not found at {path}")
+            return False
+        try:
+            model = tf.keras.models.load_model(path)
+            print(f"Pest model loaded successfully from {path}")
+
+            # Try to detect input shape
             try:
-                self.model = tf.keras.models.load_model(path)
-                print(f"Pest model loaded successfully from {path}")
-                
-                # Try to detect input shape
-                try:
-                    self.input_shape = self.model.input_shape[1:3] # e.g., (224, 224)
-                    print(f"Detected model input shape: {self.input_shape}")
-                except:
-                    self.input_shape = (224, 224) # Default fallback
-                    print("Could not detect input shape, using default (224, 224)")
-                    
-                return True
-            except Exception as e:
-                print(f"Error loading pest model: {e}")
-                return False
-        print(f"Pest model not found at {path}")
-        return False
-
-    def predict(self, image_path):
+                input_shape = model.input_shape[1:3] # e.g., (224, 224)
+                print(f"Detected model input shape: {input_shape}")
+            except:
+                input_shape = (224, 224) # Default fallback
+                print("Could not detect input shape, using default (224, 224)")
+
+            # Warms up the inference path before anything can use it
+            self.set_backend(Config.PEST_INFERENCE_BACKEND, model=model, model_path=path)
+
+            batcher = None
+            if Config.PEST_BATCH_MAX_SIZE > 1:
+                batcher = MicroBatcher(
+                    self._forward,
+                    max_batch_size=Config.PEST_BATCH_MAX_SIZE,
+                    max_wait_ms=Config.PEST_BATCH_MAX_WAIT_MS,
+                    name='pest-batcher',
+                    timeout=Config.PEST_BATCH_TIMEOUT_S
+                )
+        except Exception as e:
+            print(f"Error loading pest model: {e}")
+            return False
+
+        # Publish only a fully initialised model; predict() checks self.model
+        self.input_shape = input_shape
+        self.model_path = path
+        self.batcher = batcher
+        self.model = model
+        return True
+
+    def preprocess_image(self, image):
+        """
+        Load an image as a raw [0, 255] float32 array of shape (160, 160, 3).
+        `image` may be a file path, raw bytes or a binary file-like object,
+        so uploads can be decoded straight from the request body.
+        """
+        if isinstance(image, (bytes, bytearray, memoryview)):
+            image = io.BytesIO(image)
+        elif isinstance(image, str) and not os.path.exists(image):
+            raise FileNotFoundError(f"Image not found at: {image}")
+
+        img = Image.open(image)
+        # JPEG only: let the decoder downscale by 1/2..1/8 so large phone
+        # photos are never decoded at full resolution (no-op for PNG)
+        img.draft('RGB', self.INPUT_SIZE)
+        img = img.convert('RGB')
+        img = img.resize(self.INPUT_SIZE)
+
+        # CRITICAL: User training code has `layers.Rescaling(1./255)` INSIDE the model.
+        # So we must pass RAW values [0, 255] to the model.
+        # Do NOT normalize here.
+        return tf.keras.preprocessing.image.img_to_array(img)
+
+    def set_backend(self, backend, model=None, model_path=None):
+        """
+        Select the inference path: 'keras' (model.predict), 'function'
+        (tf.function direct call) or 'tflite'. Unavailable paths fall back
+        to 'keras'. The chosen path is warmed up before it replaces the
+        current one, so requests never see a half-built backend.
+        """
+        model = self.model if model is None else model
+        model_path = self.model_path if model_path is None else model_path
+        infer_fn, tflite, chosen = None, None, 'keras'
+        try:
+            if backend == 'tflite':
+                tflite = self._load_tflite(model, model_path)
+                chosen = 'tflite'
+            elif backend == 'function':
+                spec = tf.TensorSpec(shape=(None, *self.INPUT_SIZE, 3), dtype=tf.float32)
+
+                @tf.function(input_signature=[spec])
+                def infer(x):
+                    return model(x, training=False)
+
+                infer_fn = infer
+                chosen = 'function'
+        except Exception as e:
+            print(f"Pest inference backend '{backend}' unavailable, using keras: {e}")
+
+        # Warm up (traces the tf.function / allocates TFLite tensors)
+        self._run_backend(np.zeros((1, *self.INPUT_SIZE, 3), dtype=np.float32), model, infer_fn, tflite)
+        self._infer_fn, self._tflite, self.backend = infer_fn, tflite, chosen
+        print(f"Pest inference backend: {self.backend}")
+        return self.backend
+
+    def _load_tflite(self, model, model_path):
+        # Export next to the .keras file and reuse it until the source model changes
+        tflite_path = os.path.splitext(model_path)[0] + '.tflite'
+        if not os.path.exists(tflite_path) or os.path.getmtime(tflite_path) < os.path.getmtime(model_path):
+            converter = tf.lite.TFLiteConverter.from_keras_model(model)
+            with open(tflite_path, 'wb') as f:
+                f.write(converter.convert())
+            print(f"Exported TFLite pest model to {tflite_path}")
+        interpreter = tf.lite.Interpreter(model_path=tflite_path, num_threads=Config.PEST_TFLITE_THREADS)
+        interpreter.allocate_tensors()
+        return interpreter
+
+    def _tflite_forward(self, interpreter, batch):
+        with self._tflite_lock:
+            inp = interpreter.get_input_details()[0]
+            if tuple(inp['shape']) != batch.shape:
+                interpreter.resize_tensor_input(inp['index'], batch.shape)
+                interpreter.allocate_tensors()
+                inp = interpreter.get_input_details()[0]
+            interpreter.set_tensor(inp['index'], batch)
+            interpreter.invoke()
+            return interpreter.get_tensor(interpreter.get_output_details()[0]['index']).copy()
+
+    def _raw_forward(self, batch):
+        return self._run_backend(batch, self.model, self._infer_fn, self._tflite)
+
+    def _run_backend(self, batch, model, infer_fn, tflite):
+        batch = np.asarray(batch, dtype=np.float32)
+        if tflite is not None:
+            return self._tflite_forward(tflite, batch)
+        if infer_fn is not None:
+            return infer_fn(tf.convert_to_tensor(batch)).numpy()
+        return np.asarray(model.predict(batch, verbose=0))
+
+    def _forward(self, batch):
+        """Run the CNN on a (N, 160, 160, 3) batch and return class scores."""
+        predictions = np.array(self._raw_forward(batch), dtype=np.float32)
+        # Some models already include Softmax at the end. Check if sum is ~1.0
+        sums = np.sum(predictions, axis=1)
+        not_probs = np.abs(sums - 1.0) > 0.1
+        if np.any(not_probs):
+            logging.debug(f"Pest model output is not probabilities (sum={sums[not_probs]}); applying softmax")
+            predictions[not_probs] = tf.nn.softmax(predictions[not_probs]).numpy()
+        return predictions
+
+    def predict_batch(self, images):
+        """Classify a list/array of preprocessed images in one forward pass."""
+        scores = self._forward(np.stack(images))
+        return [self._build_result(score) for score in scores]
+
+    def predict(self, image):
         if not self.model:
-            print("Model not loaded, using mock prediction")
+            logging.warning("Pest model not loaded, using mock prediction")
             return self._mock_predict()
             
         try:
-            # Load and preprocess image
-            if not os.path.exists(image_path):
-                raise FileNotFoundError(f"Image not found at: {image_path}")
-                
-            img = Image.open(image_path).convert('RGB')
-            
-            # User confirmed model trained on (160, 160)
-            target_size = (160, 160) 
-            img = img.resize(target_size)
-            
-            img_array = tf.keras.preprocessing.image.img_to_array(img)
-            img_array = tf.expand_dims(img_array, 0) # Create batch axis
-            
-            # CRITICAL: User training code has `layers.Rescaling(1./255)` INSIDE the model.
-            # So we must pass RAW values [0, 255] to the model.
-            # Do NOT normalize here.
-            
-            print(f"Input Stats - Min: {np.min(img_array)}, Max: {np.max(img_array)}, Mean: {np.mean(img_array)}")
-            
-            predictions = self.model.predict(img_array)
-            # Some models already include Softmax at the end. Check if sum is ~1.0
-            pred_sum = np.sum(predictions[0])
-            if abs(pred_sum - 1.0) > 0.1:
-                print(f"Model output does not seem to be probabilities (sum={pred_sum}). Applying softmax.")
-                score = tf.nn.softmax(predictions[0]).numpy()
-            else:
-                score = predictions[0]
-            
-            class_idx = int(np.argmax(score))
-            confidence = float(np.max(score)) * 100
-            
-            print(f"Prediction Index: {class_idx}, Confidence: {confidence:.2f}%")
-            
-            # Safety check for class index
-            detected_class = "Unknown"
-            if class_idx < len(self.classes):
-                detected_class = self.classes[class_idx]
+            cache = self.cache
+            if not cache.enabled:
+                return self._infer(self.preprocess_image(image))
+
+            # Content-addressed lookup: exact bytes first, then perceptual hash
+            data = self._read_bytes(image)
+            sha = sha256_bytes(data)
+            cached = cache.get_exact(sha)
+            if cached is not None:
+                return cached
+
+            img_array = self.preprocess_image(data)
+            phash = None
+            if cache.phash_enabled:
+                phash = dhash(img_array)
+                cached = cache.get_near(phash, sha)
+                if cached is not None:
+                    return cached
             else:
-                print(f"IndexError: Model predicted class {class_idx} but we only have {len(self.classes)} classes defined.")
-                detected_class = f"Class {class_idx}"
-            
-            # Determine if healthy based on name
-            is_healthy = "healthy" in detected_class.lower() or "background" in detected_class.lower()
-
-            result = {
-                'detected': bool(not is_healthy),
-                'pest_name': self._format_name(detected_class),
-                'confidence': float(confidence),
-                'severity': self._determine_severity(confidence, is_healthy),
-                'recommendations': self._get_recommendations(detected_class),
-                'preventiveMeasures': self._get_preventive_measures(detected_class)
-            }
-            print(f"Pest detection result: {result['pest_name']} ({result['confidence']:.1f}%)")
+                cache.miss()
+
+            started = time.perf_counter()
+            result = self._infer(img_array)
+            cache.put(sha, phash, result, time.perf_counter() - started)
             return result
+        except TimeoutError:
+            # Inference is stalled; a mock result would hide that from the caller
+            raise
         except Exception as e:
-            import traceback
-            traceback.print_exc()
-            print(f"Prediction error: {e}")
+            logging.exception(f"Pest prediction error: {e}")
             return self._mock_predict()
 
+    def _infer(self, img_array):
+        # Concurrent requests are grouped into one forward pass when batching is on
+        if self.batcher is not None:
+            score = self.batcher(img_array)
+        else:
+            score = self._forward(np.expand_dims(img_array, 0))[0]
+        return self._build_result(score)
+
+    @staticmethod
+    def _read_bytes(image):
+        if isinstance(image, (bytes, bytearray, memoryview)):
+            return bytes(image)
+        if isinstance(image, str):
+            if not os.path.exists(image):
+                raise FileNotFoundError(f"Image not found at: {image}")
+            with open(image, 'rb') as f:
+                return f.read()
+        return image.read()
+
+    def _build_result(self, score):
+        class_idx = int(np.argmax(score))
+        confidence = float(np.max(score)) * 100
+
+        # Safety check for class index
+        detected_class = "Unknown"
+        if class_idx < len(self.classes):
+            detected_class = self.classes[class_idx]
+        else:
+            logging.warning(f"Pest model predicted class {class_idx} but only {len(self.classes)} classes are defined")
+            detected_class = f"Class {class_idx}"
+        
+        # Determine if healthy based on name
+        is_healthy = "healthy" in detected_class.lower() or "background" in detected_class.lower()
+
+        result = {
+            'detected': bool(not is_healthy),
+            'pest_name': self._format_name(detected_class),
+            'confidence': float(confidence),
+            'severity': self._determine_severity(confidence, is_healthy),
+            'recommendations': self._get_recommendations(detected_class),
+            'preventiveMeasures': self._get_preventive_measures(detected_class)
+        }
+        logging.debug(f"Pest detection result: {result['pest_name']} ({result['confidence']:.1f}%)")
+        return result
+
     def _format_name(self, raw_name):
         # Convert "Tomato___Bacterial_spot" to "Tomato - Bacterial Spot"
         return raw_name.replace("___", " - ").replace("_", " ")
@@ -51,6 +51,9 @@ class User(db.Model):
 
 class Farm(db.Model):
     __tablename__ = 'farms'
+    __table_args__ = (
+        db.Index('ix_farms_user_id', 'user_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     name = db.Column(db.String(100), nullable=False)
@@ -80,6 +83,13 @@ class Farm(db.Model):
 
 class Prediction(db.Model):
     __tablename__ = 'predictions'
+    __table_args__ = (
+        # History: WHERE user_id [AND prediction_type] ORDER BY created_at DESC LIMIT n
+        db.Index('ix_predictions_user_type_created', 'user_id', 'prediction_type', 'created_at'),
+        db.Index('ix_predictions_user_created', 'user_id', 'created_at'),
+        # Per-crop yield averages in AnalyticsService
+        db.Index('ix_predictions_user_crop_yield', 'user_id', 'crop', 'predicted_yield'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     prediction_type = db.Column(db.String(50), nullable=False)  # 'yield', 'price', 'pest'
@@ -89,19 +99,71 @@ class Prediction(db.Model):
     feedback_score = db.Column(db.Integer, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
-    def to_dict(self):
+    # Hot fields copied out of input_data/result_data so they can be filtered and aggregated in SQL
+    predicted_yield = db.Column(db.Float, nullable=True)
+    confidence = db.Column(db.Float, nullable=True)
+    crop = db.Column(db.String(50), nullable=True)
+    district = db.Column(db.String(100), nullable=True)
+    recommended_crop = db.Column(db.String(50), nullable=True)
+    pest_name = db.Column(db.String(100), nullable=True)
+
+    STRUCTURED_FIELDS = ('predicted_yield', 'confidence', 'crop', 'district', 'recommended_crop', 'pest_name')
+
+    @staticmethod
+    def structured_fields(prediction_type, input_data, result):
+        """Typed column values for a prediction, from its decoded input and result dicts."""
+        input_data = input_data if isinstance(input_data, dict) else {}
+        result = result if isinstance(result, dict) else {}
+
+        def to_float(value):
+            try:
+                return float(value) if value is not None else None
+            except (TypeError, ValueError):
+                return None
+
+        def to_str(value, column):
+            # Client-supplied values: keep strings only, cut to the column length
+            if not isinstance(value, str):
+                return None
+            return value[:Prediction.__table__.c[column].type.length]
+
+        fields = {'confidence': to_float(result.get('confidence'))}
+        if prediction_type == 'yield':
+            fields['predicted_yield'] = to_float(result.get('predicted_yield'))
+            fields['crop'] = to_str(input_data.get('Crop'), 'crop')
+            fields['district'] = to_str(input_data.get('District'), 'district')
+        elif prediction_type == 'recommendation':
+            fields['recommended_crop'] = to_str(result.get('recommended_crop'), 'recommended_crop')
+            fields['district'] = to_str(input_data.get('district'), 'district')
+        elif prediction_type == 'pest':
+            fields['pest_name'] = to_str(result.get('pest_name'), 'pest_name')
+        return fields
+
+    def to_dict(self, decode_json=True):
+        # decode_json=False returns input_data/result_data as the stored JSON strings
+        if decode_json:
+            input_data = json.loads(self.input_data) if self.input_data else {}
+            result_data = json.loads(self.result_data) if self.result_data else {}
+        else:
+            input_data, result_data = self.input_data, self.result_data
         return {
             'id': self.id,
             'user_id': self.user_id,
             'prediction_type': self.prediction_type,
-            'input_data': json.loads(self.input_data) if self.input_data else {},
-            'result_data': json.loads(self.result_data) if self.result_data else {},
+            'input_data': input_data,
+            'result_data': result_data,
             'image_path': self.image_path,
-            'created_at': self.created_at.isoformat()
+            'created_at': self.created_at.isoformat(),
+            **{field: getattr(self, field) for field in self.STRUCTURED_FIELDS}
         }
 
 class Notification(db.Model):
     __tablename__ = 'notifications'
+    __table_args__ = (
+        db.Index('ix_notifications_user_created', 'user_id', 'created_at'),
+        # One row per (user, alert, location, time window); NULL for ordinary notifications
+        db.Index('ux_notifications_dedup_key', 'dedup_key', unique=True),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     title = db.Column(db.String(100), nullable=False)
@@ -109,6 +171,7 @@ class Notification(db.Model):
     type = db.Column(db.String(20), default='info')  # 'info', 'warning', 'success', 'error'
     is_read = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    dedup_key = db.Column(db.String(40), nullable=True)
 
     def to_dict(self):
         return {
@@ -123,6 +186,11 @@ class Notification(db.Model):
 
 class NetworkMetric(db.Model):
     __tablename__ = 'network_metrics'
+    __table_args__ = (
+        # Covering indexes for the per-region / per-ISP averages in NetworkMonitor
+        db.Index('ix_network_metrics_region', 'region', 'latency_ms', 'packet_loss_rate'),
+        db.Index('ix_network_metrics_isp', 'isp_name', 'latency_ms'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     latency_ms = db.Column(db.Float, nullable=True)
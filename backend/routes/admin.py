@@ -1,8 +1,9 @@
-from flask import Blueprint, jsonify, request
-from middleware.auth_middleware import token_required, admin_required
+from flask import Blueprint, jsonify, request, current_app, g
+from middleware.auth_middleware import token_required, admin_required, invalidate_user
 from models import db, User, Prediction, Farm
 from services.network_monitor import NetworkMonitor
-from utils.dsa import kmp_search, HashTable, Stack, merge_sort, binary_search, user_cache, admin_stack
+from utils.dsa import kmp_search, merge_sort, binary_search, admin_stack
+from services.stats_service import stats_service
 import psutil
 import time
 import os
@@ -12,33 +13,26 @@ import random
 admin_bp = Blueprint('admin', __name__)
 monitor = NetworkMonitor()
 
+# Upper bound on reports accepted by /network/report in one request
+MAX_NETWORK_REPORTS = 500
+
 @admin_bp.route('/stats', methods=['GET'])
 @token_required
 @admin_required
 def get_stats():
-    # DSA ROADMAP: Use Hash Table for quick stats caching (mocking key based on time window)
-    cache_key = f"stats_{int(time.time() / 60)}" # 1 minute cache
-    cached_stats = user_cache.get(cache_key)
-    if cached_stats:
-        return jsonify(cached_stats), 200
-
-    total_users = User.query.count()
-    active_users = User.query.filter_by(status='active').count()
-    inactive_users = User.query.filter_by(status='inactive').count()
+    # One conditional-aggregation query, reused for STATS_REFRESH_SECONDS
+    counts = stats_service.user_status_counts()
     
     # Mock 'new this month'
     new_users = 12
     
     stats = {
-        'totalUsers': total_users,
-        'activeUsers': active_users,
-        'inactiveUsers': inactive_users,
+        'totalUsers': counts['total'],
+        'activeUsers': counts['active'],
+        'inactiveUsers': counts['inactive'],
         'newUsersThisMonth': new_users
     }
     
-    # Store in DSA Hash Table
-    user_cache.set(cache_key, stats)
-    
     # DSA ROADMAP: Push to action stack
     admin_stack.push({'action': 'view_stats', 'timestamp': time.time()})
     
@@ -47,21 +41,34 @@ def get_stats():
 @admin_bp.route('/network/report', methods=['POST'])
 # Start with public endpoint or user token protected
 # Frontend sends report: { latency: 45, region: 'North', isp: 'Jio', packet_loss: 0.1 }
+# or a batch: [ {...}, {...} ] / { reports: [ {...}, {...} ] }
 @token_required
 def report_network_metrics():
-    data = request.get_json()
-    user_id = request.g.current_user.id
-    ip = request.remote_addr
-    ua = request.headers.get('User-Agent')
-    
-    monitor.log_metric(
-        user_id=user_id, 
-        ip_address=ip, 
-        user_agent_str=ua, 
-        latency=data.get('latency', 0),
-        client_data=data
+    data = request.get_json(silent=True)
+    if isinstance(data, dict) and isinstance(data.get('reports'), list):
+        reports = data['reports']
+    elif isinstance(data, list):
+        reports = data
+    elif isinstance(data, dict):
+        reports = [data]
+    else:
+        return jsonify({'message': 'Expected a report object or a list of reports'}), 400
+    if len(reports) > MAX_NETWORK_REPORTS:
+        return jsonify({'message': f'Too many reports (max {MAX_NETWORK_REPORTS})'}), 413
+
+    accepted, rejected = monitor.log_metrics(
+        user_id=g.current_user.id,
+        ip_address=request.remote_addr,
+        user_agent_str=request.headers.get('User-Agent'),
+        reports=reports
     )
-    return jsonify({'status': 'recorded'}), 200
+    return jsonify({'status': 'recorded', 'accepted': accepted, 'rejected': rejected}), 200
+
+@admin_bp.route('/network/ingest-stats', methods=['GET'])
+@token_required
+@admin_required
+def get_network_ingest_stats():
+    return jsonify(monitor.ingest_stats()), 200
 
 @admin_bp.route('/connectivity-stats', methods=['GET'])
 @token_required
@@ -109,6 +116,89 @@ def get_model_accuracy():
         {'name': 'Price Prediction', 'accuracy': 88.7, 'requests': Prediction.query.filter_by(prediction_type='price').count()},
     ]), 200
 
+@admin_bp.route('/models/pest-batcher', methods=['GET'])
+@token_required
+@admin_required
+def get_pest_batcher_stats():
+    from ml_models.model_loader import ModelLoader
+    pest_model = ModelLoader().pest_model
+    batcher = pest_model.batcher if pest_model else None
+    if batcher is None:
+        return jsonify({'enabled': False}), 200
+    return jsonify({'enabled': True, **batcher.stats()}), 200
+
+@admin_bp.route('/models/prediction-cache', methods=['GET'])
+@token_required
+@admin_required
+def get_prediction_cache_stats():
+    from ml_models.model_loader import ModelLoader
+    return jsonify(ModelLoader().prediction_cache.stats()), 200
+
+@admin_bp.route('/models/pest-cache', methods=['GET'])
+@token_required
+@admin_required
+def get_pest_cache_stats():
+    from ml_models.model_loader import ModelLoader
+    pest_model = ModelLoader().pest_model
+    if pest_model is None:
+        return jsonify({'enabled': False}), 200
+    return jsonify({'enabled': pest_model.cache.enabled, **pest_model.cache.stats()}), 200
+
+@admin_bp.route('/db/write-behind', methods=['GET'])
+@token_required
+@admin_required
+def get_write_behind_stats():
+    from services.write_behind import write_behind
+    return jsonify(write_behind.stats()), 200
+
+@admin_bp.route('/db/pool', methods=['GET'])
+@token_required
+@admin_required
+def get_db_pool_stats():
+    from services.db_pool_monitor import pool_monitor
+    options = {k: v for k, v in current_app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}).items()
+               if k != 'poolclass'}
+    return jsonify({'engine_options': options, **pool_monitor.stats()}), 200
+
+@admin_bp.route('/weather/cache', methods=['GET'])
+@token_required
+@admin_required
+def get_weather_cache_stats():
+    from services.weather_cache import weather_cache
+    return jsonify(weather_cache.stats()), 200
+
+@admin_bp.route('/weather/prefetch', methods=['GET', 'POST'])
+@token_required
+@admin_required
+def weather_prefetch():
+    # GET: prefetch-run and cache-age metrics; POST: start a run now
+    from services.weather_prefetcher import weather_prefetcher
+    if request.method == 'POST':
+        weather_prefetcher.trigger()
+    return jsonify(weather_prefetcher.stats()), 200
+
+@admin_bp.route('/weather/upstream', methods=['GET'])
+@token_required
+@admin_required
+def get_weather_upstream_stats():
+    # Circuit breaker state and per-attempt upstream latency
+    from services.weather_service import weather_client
+    return jsonify(weather_client.stats()), 200
+
+@admin_bp.route('/auth/user-cache', methods=['GET'])
+@token_required
+@admin_required
+def get_user_cache_stats():
+    from middleware.auth_middleware import user_cache
+    return jsonify(user_cache.stats()), 200
+
+@admin_bp.route('/auth/token-cache', methods=['GET'])
+@token_required
+@admin_required
+def get_token_cache_stats():
+    from middleware.auth_middleware import token_cache
+    return jsonify(token_cache.stats()), 200
+
 @admin_bp.route('/logs', methods=['GET'])
 @token_required
 @admin_required
@@ -207,6 +297,7 @@ def undo_action():
                 if 'phone' in old_data: user.phone = old_data['phone']
                 if 'location' in old_data: user.location = old_data['location']
                 db.session.commit()
+                invalidate_user(u_id)
                 return jsonify({'message': f'REVERTED: {last_action["action"]}'}), 200
 
         elif action_type == 'user_deletion':
@@ -225,6 +316,7 @@ def undo_action():
             new_user.password_hash = 'restored_user_hashed_pwd'
             db.session.add(new_user)
             db.session.commit()
+            invalidate_user(u_id)
             return jsonify({'message': f'RESTORED: {last_action["action"]}'}), 200
 
         elif action_type == 'user_creation':
@@ -233,6 +325,7 @@ def undo_action():
             if user:
                 db.session.delete(user)
                 db.session.commit()
+                invalidate_user(u_id)
                 return jsonify({'message': f'REMOVED: {last_action["action"]}'}), 200
 
         elif action_type == 'farm_creation':
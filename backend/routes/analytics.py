@@ -19,7 +19,8 @@ def get_analytics_plots():
         
         return jsonify({
             'distribution_plot': dist_plot,
-            'yield_plot': yield_plot
+            'yield_plot': yield_plot,
+            'crop_yield_averages': service.crop_yield_averages(user_id)
         }), 200
     except Exception as e:
         print(f"Error in analytics routes: {e}")
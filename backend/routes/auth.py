@@ -5,13 +5,10 @@ import datetime
 from google.oauth2 import id_token
 from google.auth.transport import requests as google_requests
 import os
-from utils.dsa import LRUCache
+from middleware.auth_middleware import invalidate_user
 
 auth_bp = Blueprint('auth', __name__)
 
-# DSA ROADMAP: LRU Cache for Session/Token management
-session_cache = LRUCache(capacity=50)
-
 @auth_bp.route('/signup', methods=['POST'])
 def signup():
     data = request.get_json()
@@ -76,6 +73,7 @@ def login():
     # Update last login
     user.last_login = datetime.datetime.utcnow()
     db.session.commit()
+    invalidate_user(user.id)
     
     # Generate token
     token = jwt.encode({
@@ -84,9 +82,6 @@ def login():
         'exp': datetime.datetime.utcnow() + datetime.timedelta(seconds=current_app.config['JWT_ACCESS_TOKEN_EXPIRES'])
     }, current_app.config['JWT_SECRET_KEY'], algorithm="HS256")
     
-    # DSA ROADMAP: Store session in LRU Cache
-    session_cache.put(token, user.to_dict())
-
     return jsonify({
         'token': token,
         'user': user.to_dict()
@@ -97,12 +92,7 @@ def verify_token():
     from middleware.auth_middleware import token_required
     from flask import g
     
-    # DSA ROADMAP: Check LRU Cache first for instant verification
-    token = request.headers.get('Authorization', '').split(" ")[-1]
-    cached_user = session_cache.get(token)
-    if cached_user:
-        return jsonify({'valid': True, 'user': cached_user, 'source': 'dsa_cache'}), 200
-
+    # Verified tokens and user snapshots are cached inside token_required
     @token_required
     def _verify():
         return jsonify({'valid': True, 'user': g.current_user.to_dict()}), 200
@@ -150,6 +140,7 @@ def google_login():
         # Update last login
         user.last_login = datetime.datetime.utcnow()
         db.session.commit()
+        invalidate_user(user.id)
         
         # Generate JWT
         token = jwt.encode({
@@ -2,6 +2,7 @@ from flask import Blueprint, jsonify
 from models import db, User, Farm, Prediction
 from middleware.auth_middleware import token_required
 from sqlalchemy import func
+from services.stats_service import stats_service
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
@@ -14,16 +15,11 @@ def get_stats():
         user_id = g.current_user.id
         is_admin = g.current_user.role == 'admin'
         
-        if is_admin:
-            # Global stats for admins
-            farm_count = Farm.query.count()
-            user_count = User.query.count()
-            prediction_count = Prediction.query.count()
-        else:
-            # Scoped stats for users
-            farm_count = Farm.query.filter_by(user_id=user_id).count()
-            user_count = 1 # Just themselves
-            prediction_count = Prediction.query.filter_by(user_id=user_id).count()
+        # Single aggregate query: global for admins, scoped for users
+        counts = stats_service.dashboard_counts(None if is_admin else user_id)
+        farm_count = counts['farms']
+        user_count = counts['users'] if is_admin else 1 # Just themselves
+        prediction_count = counts['predictions']
         
         # Simulated health metrics (can be made dynamic later)
         soil_health = 75 if farm_count > 0 else 0
@@ -59,18 +55,18 @@ def get_stats():
 def get_alerts():
     # Real alerts from weather service AND database notifications
     try:
-        from services.weather_service import WeatherService
+        from services.weather_service import weather_service
         from models import Notification
         from flask import g
         
-        service = WeatherService()
-        location = g.current_user.city or g.current_user.location or 'Islamabad' 
-        advisory_data = service.get_advisories(location)
+        # Served from the shared weather cache, kept warm by the background prefetcher
+        location = g.current_user.location or 'Islamabad'
+        advisory_data = weather_service.get_advisories(location)
         weather_alerts = advisory_data.get('alerts', [])
         
         # Trigger actual notifications for high severity weather alerts
         from utils.notification_helper import process_weather_alerts
-        process_weather_alerts(g.current_user.id, weather_alerts)
+        process_weather_alerts(g.current_user.id, weather_alerts, location)
         
         # Get latest 5 unread notifications
         db_notifications = Notification.query.filter_by(user_id=g.current_user.id).order_by(Notification.created_at.desc()).limit(5).all()
@@ -1,14 +1,18 @@
-from flask import Blueprint, request, jsonify, g, current_app
+from flask import Blueprint, request, jsonify, g, current_app, Response, stream_with_context
 from werkzeug.utils import secure_filename
 from models import db, Prediction, User
-from middleware.auth_middleware import token_required
+from middleware.auth_middleware import token_required, get_optional_user_id
 from ml_models.model_loader import ModelLoader
 from utils.dsa import DecisionTree, LinkedList, MinHeap
+from services.write_behind import write_behind
 import os
 import json
 import uuid
+import base64
 import datetime
-import jwt
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 predictions_bp = Blueprint('predictions', __name__)
 loader = ModelLoader()
@@ -36,9 +40,71 @@ recommendation_tree = DecisionTree({
 session_history = LinkedList(max_size=10)
 request_prioritizer = MinHeap()
 
+# Upper bound on rows accepted by /yield/batch in one request
+MAX_YIELD_BATCH_ROWS = 5000
+
+# Page size bounds for /history and fetch size for /history/export
+HISTORY_DEFAULT_LIMIT = 20
+HISTORY_MAX_LIMIT = 200
+EXPORT_FETCH_SIZE = 1000
+
+# Background writer for optional persistence of pest uploads. Each queued
+# upload pins its bytes in memory, so at most PEST_UPLOAD_QUEUE_MAX wait here.
+upload_writer = ThreadPoolExecutor(max_workers=2, thread_name_prefix='upload-writer')
+_uploads_lock = threading.Lock()
+_uploads_pending = 0
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in {'png', 'jpg', 'jpeg'}
 
+def _save_prediction(user_id, prediction_type, input_data, result, image_path=None):
+    """Hand the Prediction row to the write-behind queue (synchronous insert if it is full)."""
+    row = {
+        'user_id': user_id,
+        'prediction_type': prediction_type,
+        'input_data': json.dumps(input_data),
+        'result_data': json.dumps(result),
+        'image_path': image_path,
+        'created_at': datetime.datetime.utcnow(),
+        **Prediction.structured_fields(prediction_type, input_data, result)
+    }
+    if not write_behind.enqueue(Prediction, row):
+        db.session.add(Prediction(**row))
+        db.session.commit()
+
+def _persist_upload(filepath, data):
+    try:
+        with open(filepath, 'wb') as f:
+            f.write(data)
+    except OSError as e:
+        print(f"Failed to persist upload {filepath}: {e}")
+
+def _persist_queued_upload(filepath, data):
+    global _uploads_pending
+    try:
+        _persist_upload(filepath, data)
+    finally:
+        with _uploads_lock:
+            _uploads_pending -= 1
+
+def _queue_upload(filepath, data, max_pending):
+    """Persist in the background, or inline once max_pending uploads are already waiting (slow disk)."""
+    global _uploads_pending
+    with _uploads_lock:
+        queued = _uploads_pending < max_pending
+        if queued:
+            _uploads_pending += 1
+    if queued:
+        try:
+            upload_writer.submit(_persist_queued_upload, filepath, data)
+            return
+        except RuntimeError:  # executor shut down
+            with _uploads_lock:
+                _uploads_pending -= 1
+    else:
+        print(f"Upload writer backlog at {max_pending}, writing {os.path.basename(filepath)} inline")
+    _persist_upload(filepath, data)
+
 @predictions_bp.route('/yield', methods=['POST'])
 def predict_yield():
     data = request.get_json()
@@ -46,15 +112,7 @@ def predict_yield():
         return jsonify({'message': 'No data provided'}), 400
         
     # Optional Auth check
-    current_user_id = None
-    if 'Authorization' in request.headers:
-        try:
-            token = request.headers['Authorization'].split(" ")[1]
-            decoded = jwt.decode(token, current_app.config['JWT_SECRET_KEY'], algorithms=["HS256"])
-            current_user_id = decoded['user_id']
-        except:
-            # Token invalid or expired, proceed as anonymous
-            pass
+    current_user_id = get_optional_user_id()
 
     try:
         # Run prediction
@@ -82,18 +140,11 @@ def predict_yield():
         # Save to DB only if user is logged in
         if current_user_id:
             try:
-                prediction = Prediction(
-                    user_id=current_user_id,
-                    prediction_type='yield',
-                    input_data=json.dumps(data),
-                    result_data=json.dumps(result)
-                )
-                db.session.add(prediction)
-                db.session.commit()
+                _save_prediction(current_user_id, 'yield', data, result)
                 
                 # Trigger notification
-                from utils.notification_helper import create_notification
-                create_notification(
+                from utils.notification_helper import queue_notification
+                queue_notification(
                     user_id=current_user_id,
                     title="Yield Prediction Ready",
                     message=f"System calculated {result['predicted_yield']} maunds/acre based on your data.",
@@ -119,6 +170,43 @@ def predict_yield():
             
         return jsonify({'message': f"Model Error: {str(e)}", 'details': str(e)}), 500
 
+@predictions_bp.route('/yield/batch', methods=['POST'])
+def predict_yield_batch():
+    data = request.get_json()
+    rows = data.get('rows') if isinstance(data, dict) else data
+    if not rows or not isinstance(rows, list):
+        return jsonify({'message': 'Expected a non-empty list of rows'}), 400
+    if len(rows) > MAX_YIELD_BATCH_ROWS:
+        return jsonify({'message': f'Batch too large (max {MAX_YIELD_BATCH_ROWS} rows)'}), 413
+
+    try:
+        # One feature matrix and one estimator call for the whole batch
+        predictions = loader.predict_yield_batch(rows)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'message': f"Model Error: {str(e)}"}), 500
+
+    results = []
+    for i, pred in enumerate(predictions):
+        if 'error' in pred:
+            results.append({'index': i, 'error': pred['error']})
+        else:
+            results.append({
+                'index': i,
+                'predicted_yield': pred['predicted_yield'],
+                'unit': 'maunds/acre',
+                'confidence': 85.0
+            })
+
+    failed = sum(1 for r in results if 'error' in r)
+    return jsonify({
+        'results': results,
+        'total': len(results),
+        'succeeded': len(results) - failed,
+        'failed': failed
+    }), 200
+
 @predictions_bp.route('/recommendation', methods=['POST'])
 def predict_recommendation():
     data = request.get_json()
@@ -126,14 +214,7 @@ def predict_recommendation():
         return jsonify({'message': 'No data provided'}), 400
         
     # Optional Auth check
-    current_user_id = None
-    if 'Authorization' in request.headers:
-        try:
-            token = request.headers['Authorization'].split(" ")[1]
-            decoded = jwt.decode(token, current_app.config['JWT_SECRET_KEY'], algorithms=["HS256"])
-            current_user_id = decoded['user_id']
-        except:
-            pass
+    current_user_id = get_optional_user_id()
 
     try:
         # Run ML prediction
@@ -150,14 +231,7 @@ def predict_recommendation():
         
         # Save to DB if logged in
         if current_user_id:
-            prediction = Prediction(
-                user_id=current_user_id,
-                prediction_type='recommendation',
-                input_data=json.dumps(data),
-                result_data=json.dumps(result)
-            )
-            db.session.add(prediction)
-            db.session.commit()
+            _save_prediction(current_user_id, 'recommendation', data, result)
             
             # DSA ROADMAP: Add to Linked List history
             session_history.add({
@@ -168,8 +242,8 @@ def predict_recommendation():
             })
             
             # Trigger notification
-            from utils.notification_helper import create_notification
-            create_notification(
+            from utils.notification_helper import queue_notification
+            queue_notification(
                 user_id=current_user_id,
                 title="Crop Recommendation Generated",
                 message=f"Our AI recommends planting {result['recommended_crop']}. View full details.",
@@ -191,37 +265,26 @@ def detect_pest():
     file = request.files['image']
     
     # Optional Auth check
-    current_user_id = None
-    if 'Authorization' in request.headers:
-        try:
-            token = request.headers['Authorization'].split(" ")[1]
-            decoded = jwt.decode(token, current_app.config['JWT_SECRET_KEY'], algorithms=["HS256"])
-            current_user_id = decoded['user_id']
-        except:
-            pass
+    current_user_id = get_optional_user_id()
 
     if file and allowed_file(file.filename):
         filename = secure_filename(f"{uuid.uuid4()}_{file.filename}")
-        filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        # Decode straight from the request body; the model never touches disk
+        image_bytes = file.read()
+
+        filepath = None
+        if current_app.config.get('SAVE_PEST_UPLOADS', True):
+            filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
+            _queue_upload(filepath, image_bytes, current_app.config.get('PEST_UPLOAD_QUEUE_MAX', 8))
         
         try:
             # Run detection using loader helper
-            print(f"[PEST DEBUG] Starting prediction for {filepath}")
-            result = loader.predict_pest(filepath)
-            print(f"[PEST DEBUG] Prediction successful: {result}")
+            result = loader.predict_pest(image_bytes)
+            logging.debug(f"Pest prediction for {filename}: {result.get('pest_name')}")
             
             # Save to DB only if logged in
             if current_user_id:
-                prediction = Prediction(
-                    user_id=current_user_id,
-                    prediction_type='pest',
-                    input_data=json.dumps({'filename': filename}),
-                    result_data=json.dumps(result),
-                    image_path=filepath
-                )
-                db.session.add(prediction)
-                db.session.commit()
+                _save_prediction(current_user_id, 'pest', {'filename': filename}, result, image_path=filepath)
                 
                 # DSA ROADMAP: Add to Linked List history
                 session_history.add({
@@ -232,8 +295,8 @@ def detect_pest():
                 })
                 
                 # Trigger notification
-                from utils.notification_helper import create_notification
-                create_notification(
+                from utils.notification_helper import queue_notification
+                queue_notification(
                     user_id=current_user_id,
                     title="Pest Analysis Complete",
                     message=f"Detection finished: {result.get('label', 'No issues detected')}. View report.",
@@ -241,32 +304,111 @@ def detect_pest():
                 )
             
             return jsonify(result), 200
+        except TimeoutError as e:
+            logging.warning(f"Pest prediction timed out for {filename}: {e}")
+            return jsonify({'message': 'Pest analysis is busy, please retry shortly'}), 503
         except Exception as e:
-            import traceback
-            traceback.print_exc()
             error_msg = f"Analysis Error: {str(e)}"
-            print(f"[PEST DEBUG] ERROR: {error_msg}")
+            logging.exception(f"Pest prediction failed for {filename}")
             return jsonify({'message': error_msg}), 500
 
             
     return jsonify({'message': 'Invalid file type'}), 400
 
+def _encode_cursor(prediction):
+    raw = f"{prediction.created_at.isoformat()}|{prediction.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_cursor(cursor):
+    """(created_at, id) of the last row on the previous page; ValueError if malformed."""
+    try:
+        created_at, pred_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.datetime.fromisoformat(created_at), int(pred_id)
+    except (ValueError, UnicodeError) as e:
+        raise ValueError('Invalid cursor') from e
+
+def _history_query(user_id, pred_type=None):
+    query = Prediction.query.filter_by(user_id=user_id)
+    if pred_type:
+        query = query.filter_by(prediction_type=pred_type)
+    # Served by ix_predictions_user_created / ix_predictions_user_type_created
+    return query.order_by(Prediction.created_at.desc(), Prediction.id.desc())
+
 @predictions_bp.route('/history', methods=['GET'])
 @token_required
 def get_history():
+    """
+    Newest-first prediction history, one keyset page at a time.
+
+    Query params: type, limit (default 20, max 200), cursor (next_cursor
+    from the previous page) and decode=false to return input_data /
+    result_data as stored JSON strings.
+    """
     # DSA ROADMAP: Use Linked List history for recently active session
     history_list = session_history.get_all()
     
     pred_type = request.args.get('type')
-    query = Prediction.query.filter_by(user_id=g.current_user.id)
-    
-    if pred_type:
-        query = query.filter_by(prediction_type=pred_type)
-        
-    db_predictions = query.order_by(Prediction.created_at.desc()).limit(20).all()
+    decode = request.args.get('decode', 'true').lower() != 'false'
+    try:
+        limit = min(max(int(request.args.get('limit', HISTORY_DEFAULT_LIMIT)), 1), HISTORY_MAX_LIMIT)
+    except ValueError:
+        return jsonify({'message': 'limit must be an integer'}), 400
+
+    query = _history_query(g.current_user.id, pred_type)
+
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            created_at, pred_id = _decode_cursor(cursor)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+        # Seek past the last row seen instead of OFFSET, so every page costs the same
+        query = query.filter(db.or_(
+            Prediction.created_at < created_at,
+            db.and_(Prediction.created_at == created_at, Prediction.id < pred_id)
+        ))
+
+    # One extra row tells us whether there is a next page
+    db_predictions = query.limit(limit + 1).all()
+    has_more = len(db_predictions) > limit
+    db_predictions = db_predictions[:limit]
     
     return jsonify({
         'session_history': history_list,
-        'db_history': [p.to_dict() for p in db_predictions]
+        'db_history': [p.to_dict(decode_json=decode) for p in db_predictions],
+        'next_cursor': _encode_cursor(db_predictions[-1]) if has_more else None
     }), 200
 
+@predictions_bp.route('/history/export', methods=['GET'])
+@token_required
+def export_history():
+    """Stream the caller's full history (optionally ?type=) as NDJSON, newest first."""
+    user_id = g.current_user.id
+    pred_type = request.args.get('type')
+
+    columns = (Prediction.id, Prediction.prediction_type, Prediction.input_data,
+               Prediction.result_data, Prediction.image_path, Prediction.created_at) + \
+              tuple(getattr(Prediction, field) for field in Prediction.STRUCTURED_FIELDS)
+    query = db.session.query(*columns).filter(Prediction.user_id == user_id)
+    if pred_type:
+        query = query.filter(Prediction.prediction_type == pred_type)
+    # Plain column tuples fetched EXPORT_FETCH_SIZE at a time through a server-side cursor
+    rows = query.order_by(Prediction.created_at.desc(), Prediction.id.desc()).yield_per(EXPORT_FETCH_SIZE)
+
+    def generate():
+        for pred_id, p_type, input_data, result_data, image_path, created_at, *structured in rows:
+            meta = json.dumps({
+                'id': pred_id,
+                'user_id': user_id,
+                'prediction_type': p_type,
+                'image_path': image_path,
+                'created_at': created_at.isoformat() if created_at else None,
+                **dict(zip(Prediction.STRUCTURED_FIELDS, structured))
+            })
+            # The blobs are stored as JSON already; splice them in rather than decode/re-encode
+            yield (f'{meta[:-1]}, "input_data": {input_data or "{}"}, '
+                   f'"result_data": {result_data or "{}"}}}\n')
+
+    filename = f"predictions_{user_id}.ndjson"
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson',
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
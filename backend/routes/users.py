@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify, g
 from models import db, User
-from middleware.auth_middleware import token_required, admin_required
+from middleware.auth_middleware import token_required, admin_required, invalidate_user
 from utils.dsa import merge_sort, binary_search, admin_stack
 
 users_bp = Blueprint('users', __name__)
@@ -92,6 +92,7 @@ def update_user(user_id):
         
     try:
         db.session.commit()
+        invalidate_user(user.id)
         
         # Trigger notification
         from utils.notification_helper import create_notification
@@ -161,6 +162,7 @@ def delete_user(user_id):
         
         db.session.delete(user)
         db.session.commit()
+        invalidate_user(user_id)
         return jsonify({'message': 'User deleted successfully'}), 200
     except Exception as e:
         db.session.rollback()
@@ -1,25 +1,26 @@
 from flask import Blueprint, request, jsonify
-from services.weather_service import WeatherService
+from services.weather_service import weather_service as service
 from middleware.auth_middleware import token_required
 
 weather_bp = Blueprint('weather', __name__)
-service = WeatherService()
+
+def _requested_location():
+    # Default to the user's stored location, which the background prefetcher keeps warm
+    from flask import g
+    default_city = getattr(g.current_user, 'location', None) or 'Multan'
+    return request.args.get('location', default_city)
 
 @weather_bp.route('/current', methods=['GET'])
 @token_required
 def current_weather():
-    from flask import g
-    default_city = getattr(g.current_user, 'city', 'Multan') or 'Multan'
-    location = request.args.get('location', default_city)
+    location = _requested_location()
     data = service.get_current_weather(location)
     return jsonify(data), 200
 
 @weather_bp.route('/forecast', methods=['GET'])
 @token_required
 def forecast():
-    from flask import g
-    default_city = getattr(g.current_user, 'city', 'Multan') or 'Multan'
-    location = request.args.get('location', default_city)
+    location = _requested_location()
     data = service.get_forecast(location)
     return jsonify(data), 200
 
@@ -28,10 +29,9 @@ def forecast():
 def alerts():
     from flask import g
     from utils.notification_helper import process_weather_alerts
-    default_city = getattr(g.current_user, 'city', 'Multan') or 'Multan'
-    location = request.args.get('location', default_city)
+    location = _requested_location()
     data = service.get_advisories(location)
-    process_weather_alerts(g.current_user.id, data.get('alerts', []))
+    process_weather_alerts(g.current_user.id, data.get('alerts', []), location)
     return jsonify(data), 200
 
 @weather_bp.route('/all', methods=['GET'])
@@ -39,18 +39,11 @@ def alerts():
 def all_weather_data():
     from flask import g
     from utils.notification_helper import process_weather_alerts
-    default_city = getattr(g.current_user, 'city', 'Multan') or 'Multan'
-    location = request.args.get('location', default_city)
+    location = _requested_location()
     
-    # Fetch all data in parallel or sequence
-    current = service.get_current_weather(location)
-    forecast = service.get_forecast(location)
-    advisories = service.get_advisories(location)
+    # Current and forecast are fetched in parallel; advisories reuse the current weather
+    data = service.get_all(location)
     
-    process_weather_alerts(g.current_user.id, advisories.get('alerts', []))
+    process_weather_alerts(g.current_user.id, data['advisories'].get('alerts', []), location)
     
-    return jsonify({
-        'current': current,
-        'forecast': forecast,
-        'advisories': advisories
-    }), 200
+    return jsonify(data), 200
@@ -5,7 +5,8 @@ import seaborn as sns
 import io
 import base64
 import pandas as pd
-from models import Prediction
+from sqlalchemy import func
+from models import db, Prediction
 
 class AnalyticsService:
     def __init__(self):
@@ -16,19 +17,20 @@ class AnalyticsService:
     def generate_prediction_distribution(self, user_id):
         """Generates a seaborn countplot of prediction types for the user"""
         try:
-            # Fetch data from DB
-            predictions = Prediction.query.filter_by(user_id=user_id).all()
-            if not predictions:
+            # Counts per type come straight from the database
+            counts = db.session.query(Prediction.prediction_type, func.count(Prediction.id)) \
+                .filter(Prediction.user_id == user_id) \
+                .group_by(Prediction.prediction_type).all()
+            if not counts:
                 return None
             
             df = pd.DataFrame([{
-                'type': p.type.capitalize(),
-                'result': p.result,
-                'date': p.created_at
-            } for p in predictions])
+                'type': p_type.capitalize(),
+                'count': count
+            } for p_type, count in counts])
 
             plt.figure(figsize=(10, 6))
-            ax = sns.countplot(data=df, x='type', hue='type', palette='viridis', legend=False)
+            ax = sns.barplot(data=df, x='type', y='count', hue='type', palette='viridis', legend=False)
             plt.title('Distribution of Agricultural Predictions (EDA)', fontsize=15)
             plt.xlabel('Prediction Category', fontsize=12)
             plt.ylabel('Count', fontsize=12)
@@ -47,24 +49,12 @@ class AnalyticsService:
     def generate_yield_analysis(self, user_id):
         """Generates a matplotlib analysis of predicted yields"""
         try:
-            predictions = Prediction.query.filter_by(user_id=user_id, type='yield').all()
-            if not predictions:
-                return None
-            
-            data = []
-            for p in predictions:
-                # Try to extract numerical yield from result string if possible
-                try:
-                    val = float(p.result.split()[0])
-                    data.append({'date': p.created_at, 'yield': val})
-                except:
-                    continue
-            
+            data = self.yield_trend(user_id)
             if not data:
                 return None
 
             df = pd.DataFrame(data)
-            df = df.sort_values('date')
+            df['date'] = pd.to_datetime(df['date'])
 
             plt.figure(figsize=(10, 6))
             plt.plot(df['date'], df['yield'], marker='o', linestyle='-', color='#10b981', linewidth=2)
@@ -83,3 +73,32 @@ class AnalyticsService:
         except Exception as e:
             print(f"Error generating yield plot: {e}")
             return None
+
+    def yield_trend(self, user_id):
+        """Average predicted yield per day, aggregated in SQL"""
+        day = func.date(Prediction.created_at)
+        rows = db.session.query(day, func.avg(Prediction.predicted_yield), func.count(Prediction.id)) \
+            .filter(Prediction.user_id == user_id,
+                    Prediction.prediction_type == 'yield',
+                    Prediction.predicted_yield.isnot(None)) \
+            .group_by(day).order_by(day).all()
+        return [{'date': str(d), 'yield': round(float(avg), 2), 'count': count} for d, avg, count in rows]
+
+    def crop_yield_averages(self, user_id):
+        """Average/min/max predicted yield per crop, aggregated in SQL"""
+        rows = db.session.query(
+            Prediction.crop,
+            func.avg(Prediction.predicted_yield),
+            func.min(Prediction.predicted_yield),
+            func.max(Prediction.predicted_yield),
+            func.count(Prediction.id)
+        ).filter(Prediction.user_id == user_id,
+                 Prediction.predicted_yield.isnot(None)) \
+            .group_by(Prediction.crop).all()
+        return [{
+            'crop': crop or 'Unknown',
+            'avg_yield': round(float(avg), 2),
+            'min_yield': round(float(lo), 2),
+            'max_yield': round(float(hi), 2),
+            'count': count
+        } for crop, avg, lo, hi, count in rows]
@@ -0,0 +1,121 @@
+import threading
+import time
+from collections import deque
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that reports how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            pool_monitor.record_timeout(time.perf_counter() - started)
+            raise
+        pool_monitor.record_wait(self, time.perf_counter() - started)
+        return conn
+
+
+class PoolMonitor:
+    """
+    Connection pool instrumentation: connections opened, checkouts, current
+    and peak checked-out count, overflow use, checkout wait times and pool
+    timeouts. Installed by init_app() before db.init_app(), which swaps the
+    engine's pool class for InstrumentedQueuePool.
+    """
+
+    def __init__(self, window=1000):
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=window)  # recent checkout waits (seconds)
+        self._pool = None
+        self.enabled = False
+
+        # Metrics
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.overflow_checkouts = 0
+        self.timeouts = 0
+        self.peak_checked_out = 0
+        self.max_wait = 0.0
+        self._wait_total = 0.0
+        self._wait_count = 0
+
+    def init_app(self, app):
+        options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+        # Only pooled engines (not in-memory SQLite) with the default pool class are instrumented
+        if 'pool_size' not in options or options.get('poolclass', InstrumentedQueuePool) is not InstrumentedQueuePool:
+            return
+        options['poolclass'] = InstrumentedQueuePool
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+        self.enabled = True
+        event.listen(InstrumentedQueuePool, 'connect', self._on_connect)
+        event.listen(InstrumentedQueuePool, 'checkout', self._on_checkout)
+        event.listen(InstrumentedQueuePool, 'checkin', self._on_checkin)
+        event.listen(InstrumentedQueuePool, 'invalidate', self._on_invalidate)
+
+    def _on_connect(self, dbapi_conn, conn_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_conn, conn_record, conn_proxy):
+        with self._lock:
+            self.checkouts += 1
+
+    def _on_checkin(self, dbapi_conn, conn_record):
+        with self._lock:
+            self.checkins += 1
+
+    def _on_invalidate(self, dbapi_conn, conn_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def record_wait(self, pool, waited):
+        with self._lock:
+            self._pool = pool
+            self._waits.append(waited)
+            self._wait_total += waited
+            self._wait_count += 1
+            self.max_wait = max(self.max_wait, waited)
+            checked_out = pool.checkedout()
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+            if checked_out > pool.size():
+                self.overflow_checkouts += 1
+
+    def record_timeout(self, waited):
+        with self._lock:
+            self.timeouts += 1
+            self.max_wait = max(self.max_wait, waited)
+
+    def stats(self):
+        with self._lock:
+            waits = sorted(self._waits)
+            pct = lambda q: round(waits[min(len(waits) - 1, int(q * len(waits)))] * 1000.0, 3) if waits else 0
+            pool = self._pool
+            return {
+                'enabled': self.enabled,
+                'pool_size': pool.size() if pool else None,
+                'checked_out': pool.checkedout() if pool else 0,
+                'checked_in': pool.checkedin() if pool else 0,
+                'overflow': pool.overflow() if pool else 0,
+                'peak_checked_out': self.peak_checked_out,
+                'connections_opened': self.connects,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'invalidations': self.invalidations,
+                'overflow_checkouts': self.overflow_checkouts,
+                'timeouts': self.timeouts,
+                'avg_wait_ms': round(self._wait_total / self._wait_count * 1000.0, 3) if self._wait_count else 0,
+                'p50_wait_ms': pct(0.50),
+                'p99_wait_ms': pct(0.99),
+                'max_wait_ms': round(self.max_wait * 1000.0, 3)
+            }
+
+
+# Shared instance, installed in app.py before db.init_app
+pool_monitor = PoolMonitor()
@@ -0,0 +1,170 @@
+import random
+import threading
+import time
+from collections import deque
+import requests
+from requests.adapters import HTTPAdapter
+from config import Config
+
+
+def build_session(pool_size=None):
+    """requests.Session with a keep-alive connection pool sized for our worker threads."""
+    pool_size = pool_size or Config.HTTP_POOL_SIZE
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+# Shared by outbound API clients (weather); requests.Session is safe to share for plain GETs
+http_session = build_session()
+
+
+class UpstreamUnavailable(Exception):
+    """Raised when the circuit is open or every attempt failed."""
+
+
+class CircuitBreaker:
+    """
+    closed    - calls go through; failure_threshold consecutive failures open it
+    open      - calls are rejected immediately for reset_timeout seconds
+    half_open - one trial call is let through; success closes, failure re-opens
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = 'closed'
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.times_opened = 0
+        self.rejected = 0
+
+    def allow(self):
+        with self._lock:
+            if self.state == 'open' and self.clock() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+            if self.state == 'closed':
+                return True
+            if self.state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self._trial_in_flight = False
+            if self.state == 'half_open' or self.consecutive_failures >= self.failure_threshold:
+                if self.state != 'open':
+                    self.times_opened += 1
+                self.state = 'open'
+                self.opened_at = self.clock()
+
+    def stats(self):
+        with self._lock:
+            retry_in = None
+            if self.state == 'open':
+                retry_in = round(max(0.0, self.reset_timeout - (self.clock() - self.opened_at)), 1)
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'failure_threshold': self.failure_threshold,
+                'reset_timeout_s': self.reset_timeout,
+                'retry_in_s': retry_in,
+                'times_opened': self.times_opened,
+                'rejected_calls': self.rejected
+            }
+
+
+class UpstreamClient:
+    """
+    GETs against one upstream API over the shared session, with bounded
+    retries (exponential backoff, full jitter) on connection errors, 429 and
+    5xx, and a circuit breaker so an outage costs callers nothing once it is
+    detected. A timeout is not retried, so a hanging upstream costs one
+    timeout per call, and every failed attempt counts toward the breaker.
+    4xx responses are returned as-is (not failures).
+    """
+
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(self, name, session=None, breaker=None, retries=2, backoff=0.2, timeout=5.0, window=500):
+        self.name = name
+        self.session = session or http_session
+        self.breaker = breaker or CircuitBreaker()
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self._latencies = deque(maxlen=window)  # seconds, per attempt
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.calls = 0
+        self.attempts = 0
+        self.retried = 0
+        self.failures = 0
+
+    def get(self, url, params=None):
+        if not self.breaker.allow():
+            raise UpstreamUnavailable(f"{self.name}: circuit open")
+        with self._lock:
+            self.calls += 1
+
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                with self._lock:
+                    self.retried += 1
+                time.sleep(random.uniform(0, self.backoff * (2 ** (attempt - 1))))
+            started = time.perf_counter()
+            timed_out = False
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+                error = None if response.status_code not in self.RETRY_STATUS else f"HTTP {response.status_code}"
+            except requests.RequestException as e:
+                error = f"{type(e).__name__}: {e}"
+                timed_out = isinstance(e, requests.Timeout)
+            with self._lock:
+                self.attempts += 1
+                self._latencies.append(time.perf_counter() - started)
+            if error is None:
+                self.breaker.record_success()
+                return response
+            self.breaker.record_failure()
+            if timed_out or self.breaker.state == 'open':
+                break
+
+        with self._lock:
+            self.failures += 1
+        raise UpstreamUnavailable(f"{self.name}: {error}")
+
+    def stats(self):
+        with self._lock:
+            samples = sorted(self._latencies)
+            pct = lambda q: round(samples[min(len(samples) - 1, int(q * len(samples)))] * 1000.0, 1) if samples else 0
+            stats = {
+                'upstream': self.name,
+                'calls': self.calls,
+                'attempts': self.attempts,
+                'retries': self.retried,
+                'failed_calls': self.failures,
+                'latency_p50_ms': pct(0.50),
+                'latency_p95_ms': pct(0.95),
+                'latency_p99_ms': pct(0.99),
+                'latency_max_ms': round(samples[-1] * 1000.0, 1) if samples else 0
+            }
+        return {**stats, 'breaker': self.breaker.stats()}
@@ -3,7 +3,9 @@ from sqlalchemy import func
 from datetime import datetime, timedelta
 import geoip2.database
 import user_agents
-from utils.dsa import Graph
+from config import Config
+from services.write_behind import write_behind
+from utils.dsa import Graph, LRUCache
 
 class NetworkMonitor:
     def __init__(self):
@@ -14,12 +16,23 @@ class NetworkMonitor:
         self.topology.add_edge('Central', 'South', weight=15)
         self.topology.add_edge('South', 'West', weight=30)
         self.topology.add_edge('West', 'North', weight=25)
-        pass
-        
-    def log_metric(self, user_id, ip_address, user_agent_str, latency, client_data=None):
-        # Parse User Agent
-        ua = user_agents.parse(user_agent_str)
-        device_type = 'Mobile' if ua.is_mobile else 'Tablet' if ua.is_tablet else 'Desktop'
+        # The same few hundred User-Agent strings repeat constantly; parse each once
+        self.ua_cache = LRUCache(capacity=Config.NETWORK_UA_CACHE_SIZE)
+        # Heartbeats get their own share of the write-behind queue so a flood
+        # of them cannot push predictions/notifications onto the synchronous path
+        write_behind.limit(NetworkMetric, Config.NETWORK_WRITE_BEHIND_MAX)
+
+    def _parse_user_agent(self, user_agent_str):
+        """(display string, device type) for a User-Agent header, memoized."""
+        def parse():
+            ua = user_agents.parse(user_agent_str)
+            device_type = 'Mobile' if ua.is_mobile else 'Tablet' if ua.is_tablet else 'Desktop'
+            return str(ua), device_type
+        return self.ua_cache.get_or_compute(user_agent_str or '', parse)
+
+    def build_row(self, user_id, ip_address, user_agent_str, latency, client_data=None):
+        """NetworkMetric column mapping for one report."""
+        ua_display, device_type = self._parse_user_agent(user_agent_str or '')
         
         # Mock Geo/ISP data based on IP if real DB not available
         region = 'Pakistan' # Default
@@ -35,20 +48,49 @@ class NetworkMonitor:
         if latency > 300: quality = 'Fair'
         if latency > 1000: quality = 'Poor'
         
-        metric = NetworkMetric(
-            user_id=user_id,
-            ip_address=ip_address,
-            user_agent=str(ua),
-            device_type=device_type,
-            latency_ms=latency,
-            region=region,
-            isp_name=isp,
-            connection_quality=quality,
-            packet_loss_rate=client_data.get('packet_loss', 0.0) if client_data else 0.0
-        )
-        
-        db.session.add(metric)
-        db.session.commit()
+        return {
+            'user_id': user_id,
+            'ip_address': ip_address,
+            'user_agent': ua_display,
+            'device_type': device_type,
+            'latency_ms': latency,
+            'region': region,
+            'isp_name': isp,
+            'connection_quality': quality,
+            'packet_loss_rate': client_data.get('packet_loss', 0.0) if client_data else 0.0,
+            'timestamp': datetime.utcnow()
+        }
+
+    def log_metric(self, user_id, ip_address, user_agent_str, latency, client_data=None):
+        return self.log_metrics(user_id, ip_address, user_agent_str, [dict(client_data or {}, latency=latency)])
+
+    def log_metrics(self, user_id, ip_address, user_agent_str, reports):
+        """
+        Record a list of reports ({latency, region, isp, packet_loss}). Rows go
+        to the write-behind queue, which flushes them with bulk_insert_mappings
+        on a size or time trigger; if it is full they are bulk-inserted here.
+        Returns (accepted, rejected) counts.
+        """
+        rows, rejected = [], 0
+        for report in reports:
+            try:
+                latency = float(report.get('latency', 0))
+                packet_loss = float(report.get('packet_loss', 0.0))
+            except (AttributeError, TypeError, ValueError):
+                rejected += 1
+                continue
+            rows.append(self.build_row(user_id, ip_address, user_agent_str, latency,
+                                       dict(report, packet_loss=packet_loss)))
+
+        # Never waits on a full queue; whatever does not fit is bulk-inserted right away
+        overflow = write_behind.enqueue_many(NetworkMetric, rows)
+        if overflow:
+            db.session.bulk_insert_mappings(NetworkMetric, overflow)
+            db.session.commit()
+        return len(rows), rejected
+
+    def ingest_stats(self):
+        return {'ua_cache': self.ua_cache.stats(), 'write_behind': write_behind.stats()}
         
     def get_regional_stats(self):
         # Aggregation query
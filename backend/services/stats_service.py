@@ -0,0 +1,87 @@
+from sqlalchemy import func, case, select, event
+from sqlalchemy.orm import Session
+from config import Config
+from models import db, User, Farm, Prediction
+from utils.dsa import admin_stats_cache
+
+
+class StatsService:
+    """
+    Aggregate counts for /api/admin/stats and /api/dashboard/stats.
+
+    Each set of counts is computed with a single query (conditional
+    aggregation / scalar subqueries) instead of one COUNT per figure, and
+    the result is reused for `refresh_interval` seconds from the shared
+    utils.dsa.admin_stats_cache (or the LRUCache passed as `cache`).
+
+    After init_app(), any commit that adds, changes or deletes a User or Farm
+    through the ORM session drops the cached counts. Prediction inserts do not:
+    they arrive in bulk from the write-behind queue, so prediction counts may
+    lag by up to `refresh_interval` seconds.
+    """
+
+    def __init__(self, refresh_interval=None, cache=None):
+        self.refresh_interval = Config.STATS_REFRESH_SECONDS if refresh_interval is None else refresh_interval
+        self._cache = admin_stats_cache if cache is None else cache
+
+    def _cached(self, key, compute):
+        if self.refresh_interval <= 0:
+            return compute()
+        return self._cache.get_or_compute(key, compute, ttl=self.refresh_interval)
+
+    def user_status_counts(self):
+        """{'total', 'active', 'inactive'} over the users table in one pass."""
+        def compute():
+            total, active, inactive = db.session.query(
+                func.count(User.id),
+                func.sum(case((User.status == 'active', 1), else_=0)),
+                func.sum(case((User.status == 'inactive', 1), else_=0))
+            ).one()
+            return {'total': int(total or 0), 'active': int(active or 0), 'inactive': int(inactive or 0)}
+        return self._cached('user_status', compute)
+
+    def dashboard_counts(self, user_id=None):
+        """Farm/user/prediction counts, global (user_id=None) or scoped to one user."""
+        def compute():
+            farms = select(func.count(Farm.id))
+            predictions = select(func.count(Prediction.id))
+            if user_id is not None:
+                farms = farms.where(Farm.user_id == user_id)
+                predictions = predictions.where(Prediction.user_id == user_id)
+                users = select(func.count(User.id)).where(User.id == user_id)
+            else:
+                users = select(func.count(User.id))
+
+            farm_count, user_count, prediction_count = db.session.query(
+                farms.scalar_subquery(), users.scalar_subquery(), predictions.scalar_subquery()
+            ).one()
+            return {'farms': int(farm_count or 0), 'users': int(user_count or 0),
+                    'predictions': int(prediction_count or 0)}
+        return self._cached(('dashboard', user_id), compute)
+
+    def init_app(self, app):
+        event.listen(Session, 'after_flush', self._on_flush)
+        event.listen(Session, 'after_commit', self._on_commit)
+        event.listen(Session, 'after_rollback', self._on_rollback)
+
+    def _on_flush(self, session, flush_context):
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            if isinstance(obj, (User, Farm)):
+                session.info['stats_dirty'] = True
+                return
+
+    def _on_commit(self, session):
+        if session.info.pop('stats_dirty', False):
+            self.invalidate()
+
+    def _on_rollback(self, session):
+        session.info.pop('stats_dirty', None)
+
+    def invalidate(self):
+        self._cache.clear()
+
+    def stats(self):
+        return {'refresh_interval_s': self.refresh_interval, **self._cache.stats()}
+
+
+stats_service = StatsService()
@@ -0,0 +1,260 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+from utils.dsa import LRUCache
+
+
+def normalize_location(location):
+    """Cache key form of a location: trimmed, single-spaced, case-folded."""
+    return re.sub(r'\s+', ' ', (location or '').strip()).casefold()
+
+
+class WeatherCache:
+    """
+    Shared cache for upstream weather responses, one namespace per endpoint
+    ('current', 'forecast').
+
+    - keys are (kind, normalized location), so 'Multan' and ' multan ' share an entry
+    - each kind has its own freshness TTL; once it passes, the entry is served
+      stale for up to stale_ttl more seconds while a single background fetch
+      refreshes it (stale-while-revalidate)
+    - bounded by capacity (LRU eviction)
+    - concurrent misses on one key make one upstream call (LRUCache single-flight)
+    - with sqlite_path set, every fetched entry is also written to a SQLite file
+      that all worker processes on the host read before going upstream, so one
+      process (the prefetcher) can keep every worker's cache warm
+
+    fetch callables return the parsed data, or None if the upstream call
+    failed; failures are never cached and never replace a stale entry.
+    """
+
+    def __init__(self, capacity=1024, ttls=None, stale_ttl=3600, refresh_workers=4, clock=time.monotonic,
+                 sqlite_path=None):
+        self.ttls = dict(ttls or {'current': 600, 'forecast': 1800})
+        self.stale_ttl = stale_ttl
+        self.clock = clock
+        self._entries = LRUCache(capacity=capacity, clock=clock)  # key -> (data, fetched_at)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._refresh_workers = refresh_workers
+        self._executor = None
+        self.sqlite_path = sqlite_path or None
+        self._db = None
+        self._db_pid = None
+        self._db_lock = threading.Lock()
+
+        # Metrics
+        self.fresh_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.shared_hits = 0
+
+    def _key(self, kind, location):
+        return kind, normalize_location(location)
+
+    def _remember(self, key, entry):
+        # Entries live for their fresh TTL plus the stale window, then expire outright
+        self._entries.put(key, entry, ttl=self.ttls[key[0]] + self.stale_ttl)
+
+    def _store(self, key, data):
+        if data is None:
+            return None
+        self._remember(key, (data, self.clock()))
+        self._save_shared(key, data)
+        return data
+
+    def _fresh(self, key, entry):
+        return entry is not None and self.clock() - entry[1] < self.ttls[key[0]]
+
+    def _shared_db(self):
+        # Caller holds _db_lock. One connection per process: it must not cross a fork.
+        if self._db is None or self._db_pid != os.getpid():
+            db = sqlite3.connect(self.sqlite_path, timeout=5, check_same_thread=False)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS weather_cache ('
+                'kind TEXT, location TEXT, data TEXT, fetched_at REAL, PRIMARY KEY (kind, location))'
+            )
+            db.commit()
+            self._db, self._db_pid = db, os.getpid()
+        return self._db
+
+    def _load_shared(self, key):
+        """(data, fetched_at) from the shared file, or None if absent or past the stale window."""
+        if not self.sqlite_path:
+            return None
+        try:
+            with self._db_lock:
+                row = self._shared_db().execute(
+                    'SELECT data, fetched_at FROM weather_cache WHERE kind = ? AND location = ?', key
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Shared weather cache read failed: {e}")
+            return None
+        if row is None:
+            return None
+        # Stored as wall-clock time; convert the age back to this cache's clock
+        age = time.time() - row[1]
+        if age >= self.ttls[key[0]] + self.stale_ttl:
+            return None
+        return json.loads(row[0]), self.clock() - age
+
+    def _save_shared(self, key, data):
+        if not self.sqlite_path:
+            return
+        now = time.time()
+        try:
+            with self._db_lock:
+                db = self._shared_db()
+                db.execute('INSERT OR REPLACE INTO weather_cache VALUES (?, ?, ?, ?)',
+                           (key[0], key[1], json.dumps(data), now))
+                # Rows past every kind's stale window are never served again
+                db.execute('DELETE FROM weather_cache WHERE fetched_at < ?',
+                           (now - max(self.ttls.values()) - self.stale_ttl,))
+                db.commit()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"Shared weather cache write failed: {e}")
+
+    def _take_shared(self, key):
+        # A fresh entry another process stored, copied into memory; None otherwise
+        entry = self._load_shared(key)
+        if not self._fresh(key, entry):
+            return None
+        self.shared_hits += 1
+        self._remember(key, entry)
+        return entry
+
+    def get(self, kind, location, fetch):
+        """Cached data for (kind, location), fetching on a miss. None if the fetch failed."""
+        key = self._key(kind, location)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if self._fresh(key, entry):
+                self.fresh_hits += 1
+                return entry[0]
+            shared = self._take_shared(key)
+            if shared is not None:
+                self.fresh_hits += 1  # another process already refreshed it
+                return shared[0]
+            self.stale_hits += 1
+            self._refresh(key, fetch)
+            return entry[0]
+
+        self.misses += 1
+        entry = self._entries.get_or_compute(key, lambda: self._entry(key, fetch),
+                                             ttl=self.ttls[kind] + self.stale_ttl)
+        return entry[0] if entry is not None else None
+
+    def _entry(self, key, fetch):
+        shared = self._load_shared(key)
+        if self._fresh(key, shared):
+            self.shared_hits += 1
+            return shared
+        data = fetch()
+        if data is None:
+            return shared  # upstream failed; a stale shared entry still beats nothing
+        self._save_shared(key, data)
+        return data, self.clock()
+
+    def _refresh(self, key, fetch):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._refresh_workers,
+                                                    thread_name_prefix='weather-refresh')
+        self._executor.submit(self._run_refresh, key, fetch)
+
+    def _run_refresh(self, key, fetch):
+        try:
+            if self._take_shared(key) is not None:
+                return
+            data = fetch()
+            if data is None:
+                self.refresh_failures += 1
+            else:
+                self.refreshes += 1
+                self._store(key, data)
+        except Exception as e:
+            self.refresh_failures += 1
+            print(f"Weather refresh failed for {key}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def put(self, kind, location, data):
+        return self._store(self._key(kind, location), data)
+
+    def peek(self, kind, location):
+        """Cached data for (kind, location), fresh or stale, without fetching. None if absent."""
+        key = self._key(kind, location)
+        entry = self._entries.get(key) or self._load_shared(key)
+        return entry[0] if entry is not None else None
+
+    def invalidate(self, kind, location):
+        self._entries.delete(self._key(kind, location))
+
+    def clear(self):
+        self._entries.clear()
+
+    def age(self, kind, location):
+        """Seconds since (kind, location) was fetched, or None if not cached."""
+        entry = self._entries.get(self._key(kind, location))
+        return self.clock() - entry[1] if entry is not None else None
+
+    def age_stats(self):
+        """Per-kind entry count, fresh/stale split and oldest/average age in seconds."""
+        now = self.clock()
+        ages = {kind: [] for kind in self.ttls}
+        for (kind, _), (_, fetched_at) in self._entries.items():
+            ages.setdefault(kind, []).append(now - fetched_at)
+        return {
+            kind: {
+                'entries': len(values),
+                'fresh': sum(1 for age in values if age < self.ttls.get(kind, 0)),
+                'stale': sum(1 for age in values if age >= self.ttls.get(kind, 0)),
+                'max_age_s': round(max(values), 1) if values else None,
+                'avg_age_s': round(sum(values) / len(values), 1) if values else None
+            }
+            for kind, values in ages.items()
+        }
+
+    def stats(self):
+        lookups = self.fresh_hits + self.stale_hits + self.misses
+        entries = self._entries.stats()
+        return {
+            'size': entries['size'],
+            'capacity': entries['capacity'],
+            'ttls_s': self.ttls,
+            'stale_ttl_s': self.stale_ttl,
+            'fresh_hits': self.fresh_hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'shared_hits': self.shared_hits,
+            'shared_path': self.sqlite_path,
+            'hit_rate': round((self.fresh_hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+            'coalesced_misses': entries['coalesced'],
+            'upstream_fetches': entries['computes'] + self.refreshes + self.refresh_failures,
+            'background_refreshes': self.refreshes,
+            'refresh_failures': self.refresh_failures,
+            'refreshing': len(self._refreshing),
+            'evictions': entries['evictions'],
+            'expirations': entries['expirations']
+        }
+
+
+# Shared by every WeatherService instance
+weather_cache = WeatherCache(
+    capacity=Config.WEATHER_CACHE_SIZE,
+    ttls={'current': Config.WEATHER_CURRENT_TTL, 'forecast': Config.WEATHER_FORECAST_TTL},
+    stale_ttl=Config.WEATHER_STALE_TTL,
+    sqlite_path=Config.WEATHER_CACHE_SQLITE_PATH or None
+)
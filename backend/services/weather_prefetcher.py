@@ -0,0 +1,205 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from models import db, User, Farm
+from services.weather_cache import normalize_location
+from services.weather_service import weather_service
+
+try:
+    import fcntl
+except ImportError:  # Windows: no gunicorn there, so the one process prefetches
+    fcntl = None
+
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across threads (rate <= 0 = unlimited)."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class WeatherPrefetcher:
+    """
+    Background job that keeps the weather cache warm for every location we
+    know about (distinct User.location and Farm.location values).
+
+    Every `interval` seconds it refreshes current weather and forecast for
+    each location, on at most `concurrency` threads, with upstream calls
+    spaced by a rate limiter so a run stays within the API quota. Request
+    handlers then normally hit a fresh cache entry; a location nobody has
+    stored (e.g. ?location=) still falls back to a coalesced on-demand fetch.
+
+    The thread is started lazily on the first request of each process (so
+    it survives gunicorn's fork), but only the process holding `lock_path`
+    (an exclusive flock) runs the refreshes; the others retry the lock every
+    interval and take over if the leader dies. The leader's results reach
+    the other workers through the weather cache's shared SQLite file, so
+    upstream use is locations x 2 per interval per host, whatever the worker
+    count. A run takes about locations x 2 / rate seconds and must finish
+    within the interval; run_once() warns when it does not.
+    """
+
+    KINDS = ('current', 'forecast')
+
+    def __init__(self):
+        self.app = None
+        self.enabled = False
+        self.interval = 600
+        self.concurrency = 4
+        self.limiter = RateLimiter(1.0)
+        self._thread = None
+        self._pid = None
+        self.lock_path = None
+        self._lock_file = None
+        self._lock_pid = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+
+        # Metrics
+        self.runs = 0
+        self.last_run = None
+        self.total_refreshed = 0
+        self.total_failed = 0
+        self.overruns = 0
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get('WEATHER_PREFETCH_ENABLED', True) and bool(app.config.get('OPENWEATHER_API_KEY'))
+        self.interval = app.config.get('WEATHER_PREFETCH_INTERVAL', 600)
+        self.concurrency = max(1, app.config.get('WEATHER_PREFETCH_CONCURRENCY', 4))
+        self.limiter = RateLimiter(app.config.get('WEATHER_PREFETCH_RATE', 1.0))
+        self.lock_path = app.config.get('WEATHER_PREFETCH_LOCK') or None
+        if self.enabled:
+            app.before_request(self._ensure_started)
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive() or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._loop, name='weather-prefetch', daemon=True)
+                self._thread.start()
+
+    def _holds_lock(self):
+        if fcntl is None or not self.lock_path:
+            return True
+        return self._lock_file is not None and self._lock_pid == os.getpid()
+
+    def is_leader(self):
+        """Hold (or try to take) the per-host prefetch lock; True if this process may prefetch."""
+        if self._holds_lock():
+            return True
+        lock_file = open(self.lock_path, 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        # Kept open for the life of the process; the OS releases it if we die
+        self._lock_file, self._lock_pid = lock_file, os.getpid()
+        print(f"Weather prefetch leader: pid {self._lock_pid}")
+        return True
+
+    def _loop(self):
+        while True:
+            try:
+                if self.is_leader():
+                    self.run_once()
+            except Exception as e:
+                print(f"Weather prefetch run failed: {e}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def trigger(self):
+        """Start the next run now instead of waiting for the interval."""
+        self._wake.set()
+
+    def collect_locations(self):
+        """Distinct user and farm locations, deduplicated by normalized key."""
+        with self.app.app_context():
+            try:
+                rows = db.session.query(User.location).filter(User.location.isnot(None)).distinct().all() + \
+                    db.session.query(Farm.location).filter(Farm.location.isnot(None)).distinct().all()
+            finally:
+                db.session.remove()
+        locations = {}
+        for (location,) in rows:
+            key = normalize_location(location)
+            if key:
+                locations.setdefault(key, location.strip())
+        return list(locations.values())
+
+    def _refresh_location(self, location):
+        refreshed = failed = skipped = 0
+        for kind in self.KINDS:
+            # Skip entries that will still be fresh at the next run (saves quota on long TTLs)
+            age = weather_service.cache.age(kind, location)
+            if age is not None and age + self.interval < weather_service.cache.ttls[kind]:
+                skipped += 1
+                continue
+            self.limiter.acquire()
+            if weather_service.refresh(kind, location):
+                refreshed += 1
+            else:
+                failed += 1
+        return refreshed, failed, skipped
+
+    def run_once(self):
+        started = time.perf_counter()
+        run = {'started_at': datetime.utcnow().isoformat(), 'locations': 0,
+               'refreshed': 0, 'failed': 0, 'skipped_fresh': 0, 'duration_s': None}
+        locations = self.collect_locations()
+        run['locations'] = len(locations)
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='weather-prefetch') as pool:
+            for refreshed, failed, skipped in pool.map(self._refresh_location, locations):
+                run['refreshed'] += refreshed
+                run['failed'] += failed
+                run['skipped_fresh'] += skipped
+        run['duration_s'] = round(time.perf_counter() - started, 2)
+        if run['duration_s'] > self.interval:
+            # Entries go stale between runs; raise the rate or the interval
+            self.overruns += 1
+            print(f"Weather prefetch run took {run['duration_s']}s for {len(locations)} locations, "
+                  f"longer than the {self.interval}s interval")
+
+        self.runs += 1
+        self.total_refreshed += run['refreshed']
+        self.total_failed += run['failed']
+        self.last_run = run
+        return run
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'running': self._thread is not None and self._thread.is_alive() and self._pid == os.getpid(),
+            'leader': self._holds_lock(),
+            'lock_path': self.lock_path,
+            'interval_s': self.interval,
+            'concurrency': self.concurrency,
+            'rate_per_s': round(1.0 / self.limiter.interval, 3) if self.limiter.interval else None,
+            'runs': self.runs,
+            'total_refreshed': self.total_refreshed,
+            'total_failed': self.total_failed,
+            'overruns': self.overruns,
+            'last_run': self.last_run,
+            'cache_age': weather_service.cache.age_stats()
+        }
+
+
+# Shared instance, bound to the app in app.py
+weather_prefetcher = WeatherPrefetcher()
@@ -1,38 +1,81 @@
-import requests
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from config import Config
 import random
-import time
 from utils.dsa import merge_sort
+from services.http_client import CircuitBreaker, UpstreamClient, UpstreamUnavailable
+from services.weather_cache import weather_cache
+
+# Runs the forecast fetch while the request thread fetches current weather
+fetch_pool = ThreadPoolExecutor(max_workers=Config.WEATHER_FETCH_WORKERS, thread_name_prefix='weather-fetch')
+
+# Pooled keep-alive client with retries; once the breaker opens, misses fall back immediately
+weather_client = UpstreamClient(
+    'openweathermap',
+    breaker=CircuitBreaker(failure_threshold=Config.WEATHER_BREAKER_FAILURES,
+                           reset_timeout=Config.WEATHER_BREAKER_RESET),
+    retries=Config.WEATHER_RETRIES,
+    backoff=Config.WEATHER_RETRY_BACKOFF,
+    timeout=Config.WEATHER_TIMEOUT
+)
+
+# Longest a forecast fetch can legitimately take: every attempt timing out plus the
+# retry backoff sleeps. get_all stops waiting after this (the pool is shared with
+# the prefetcher and background refreshes, so the job may also sit queued).
+FORECAST_WAIT = (weather_client.timeout * (weather_client.retries + 1)
+                 + weather_client.backoff * (2 ** weather_client.retries - 1))
 
 class WeatherService:
-    BASE_URL = "http://api.openweathermap.org/data/2.5"
+    BASE_URL = Config.OPENWEATHER_BASE_URL
     
-    # DSA ROADMAP: Memoization (DP) store for weather data by location
-    _memo = {}
+    # DSA ROADMAP: Bounded LRU shared by all instances (normalized keys, per-endpoint TTLs,
+    # single-flight misses, stale-while-revalidate)
+    cache = weather_cache
     
     def get_current_weather(self, location):
-        # DSA ROADMAP: Use manual Memoization (DP)
-        if location in self._memo:
-            # Check if cache is fresh (e.g., 10 mins)
-            data, timestamp = self._memo[location]
-            if time.time() - timestamp < 600:
-                print(f"[DSA CACHE] Hit for {location}")
-                return data
-
-        api_key = Config.OPENWEATHER_API_KEY
-        
-        if not api_key:
+        if not Config.OPENWEATHER_API_KEY:
             return self._mock_current_weather(location)
+        data = self.cache.get('current', location, lambda: self._fetch_current(location))
+        return data if data is not None else self._mock_current_weather(location)
             
+    def get_forecast(self, location):
+        if not Config.OPENWEATHER_API_KEY:
+            return self._mock_forecast()
+        data = self.cache.get('forecast', location, lambda: self._fetch_forecast(location))
+        return data if data is not None else self._mock_forecast()
+
+    def get_all(self, location):
+        """Current weather, forecast and advisories with both upstream calls in flight at once."""
+        forecast = fetch_pool.submit(self.get_forecast, location)
+        current = self.get_current_weather(location)
         try:
-            response = requests.get(f"{self.BASE_URL}/weather", params={
+            forecast_data = forecast.result(timeout=FORECAST_WAIT)
+        except FutureTimeout:
+            # The fetch keeps running and fills the cache for the next request
+            print(f"Forecast for {location} not ready after {FORECAST_WAIT:.1f}s; serving cached/mock data")
+            forecast_data = self.cache.peek('forecast', location) or self._mock_forecast()
+        return {
+            'current': current,
+            'forecast': forecast_data,
+            # Derived from the weather we already have, not fetched again
+            'advisories': self.get_advisories(location, weather=current)
+        }
+
+    def refresh(self, kind, location):
+        """Fetch 'current' or 'forecast' for location into the shared cache. False if the upstream failed."""
+        fetch = self._fetch_current if kind == 'current' else self._fetch_forecast
+        return self.cache.put(kind, location, fetch(location)) is not None
+
+    def _fetch_current(self, location):
+        # Parsed current weather, or None on any upstream failure (never cached)
+        try:
+            response = weather_client.get(f"{self.BASE_URL}/weather", params={
                 'q': location,
-                'appid': api_key,
+                'appid': Config.OPENWEATHER_API_KEY,
                 'units': 'metric'
-            }, timeout=5)
+            })
             if response.status_code == 200:
                 data = response.json()
-                weather_data = {
+                return {
                     'temp': round(data['main']['temp'], 1),
                     'condition': data['weather'][0]['main'],
                     'humidity': data['main']['humidity'],
@@ -40,37 +83,38 @@ class WeatherService:
                     'rain': data.get('rain', {}).get('1h', 0),
                     'location': data['name']
                 }
-                # Store in memoization table
-                self._memo[location] = (weather_data, time.time())
-                return weather_data
-            return self._mock_current_weather(location)
-        except:
-            return self._mock_current_weather(location)
-            
-    def get_forecast(self, location):
-        api_key = Config.OPENWEATHER_API_KEY
-        if not api_key:
-            return self._mock_forecast()
-            
+            print(f"Weather API Error: {response.status_code} - {response.text}")
+            return None
+        except UpstreamUnavailable as e:
+            print(f"Weather upstream unavailable: {e}")
+            return None
+        except Exception as e:
+            print(f"Weather Service Exception: {str(e)}")
+            return None
+
+    def _fetch_forecast(self, location):
         try:
             # OpenWeatherMap 5 day / 3 hour forecast
             url = f"{self.BASE_URL}/forecast"
             params = {
                 'q': location,
-                'appid': api_key,
+                'appid': Config.OPENWEATHER_API_KEY,
                 'units': 'metric'
             }
-            response = requests.get(url, params=params, timeout=5)
+            response = weather_client.get(url, params=params)
             
             if response.status_code == 200:
                 data = response.json()
                 return self._process_forecast_data(data)
             
             print(f"Weather API Error: {response.status_code} - {response.text}")
-            return self._mock_forecast()
+            return None
+        except UpstreamUnavailable as e:
+            print(f"Weather upstream unavailable: {e}")
+            return None
         except Exception as e:
             print(f"Weather Service Exception: {str(e)}")
-            return self._mock_forecast()
+            return None
 
     def _process_forecast_data(self, data):
         # Process 3-hour intervals into daily summaries
@@ -112,10 +156,11 @@ class WeatherService:
                     
         return processed
 
-    def get_advisories(self, location):
+    def get_advisories(self, location, weather=None):
         # 1. Get current weather data to base analysis on
-        #    We can reuse existing method or fetch fresh
-        weather = self.get_current_weather(location)
+        #    (callers that already fetched it pass it in)
+        if weather is None:
+            weather = self.get_current_weather(location)
         
         # 2. Initialize containers
         alerts = []
@@ -220,3 +265,7 @@ class WeatherService:
             }
             for day in days
         ]
+
+
+# Shared instance for request handlers and the background prefetcher
+weather_service = WeatherService()
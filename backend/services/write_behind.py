@@ -0,0 +1,266 @@
+import atexit
+import queue
+import threading
+import time
+from models import db
+
+
+class WriteBehindQueue:
+    """
+    Background write-behind buffer for insert-only rows (predictions,
+    notifications, ...).
+
+    Request threads enqueue (model, row dict) and return immediately; a
+    worker thread drains the queue in batches and writes each batch with
+    bulk_insert_mappings and a single commit. The queue is bounded: when it
+    is full, enqueue() waits up to put_timeout and then returns False so the
+    caller can fall back to a synchronous write (back-pressure). limit() caps
+    how many rows of one model may be pending, so a flood of one kind of row
+    (e.g. network heartbeats) cannot crowd the others out of the queue.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.enabled = False
+        self.batch_size = 200
+        self.flush_interval = 0.5
+        self.put_timeout = 0.05
+        self._queue = queue.Queue(maxsize=10000)
+        self._callbacks = {}  # model -> fn(rows) run after a successful commit
+        self._limits = {}     # model -> max rows pending in the queue
+        self._pending = {}    # model -> rows queued but not yet written
+        self._worker = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.enqueued = 0
+        self.rejected = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._flush_ms_total = 0.0
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get('WRITE_BEHIND_ENABLED', True)
+        self.batch_size = app.config.get('WRITE_BEHIND_BATCH_SIZE', 200)
+        self.flush_interval = app.config.get('WRITE_BEHIND_FLUSH_MS', 500) / 1000.0
+        self._queue = queue.Queue(maxsize=app.config.get('WRITE_BEHIND_MAX_QUEUE', 10000))
+        atexit.register(self.shutdown)
+
+    def on_commit(self, model, callback):
+        """Register fn(rows) to run after rows of `model` are committed."""
+        self._callbacks[model] = callback
+
+    def limit(self, model, max_pending):
+        """Cap the number of queued-but-unwritten rows of `model`."""
+        self._limits[model] = max_pending
+
+    def _reserve(self, model, count):
+        # How many of `count` rows of `model` may be queued under its limit
+        with self._lock:
+            pending = self._pending.get(model, 0)
+            limit = self._limits.get(model)
+            allowed = count if limit is None else max(0, min(count, limit - pending))
+            self._pending[model] = pending + allowed
+            return allowed
+
+    def _release(self, model, count):
+        with self._lock:
+            self._pending[model] = self._pending.get(model, 0) - count
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='write-behind', daemon=True)
+                self._worker.start()
+
+    def enqueue(self, model, row):
+        """Queue a row for insertion. Returns False if the caller must write it itself."""
+        if not self.enabled or self.app is None or self._stopping.is_set():
+            return False
+        if not self._reserve(model, 1):
+            with self._lock:
+                self.rejected += 1
+            return False
+        self._ensure_worker()
+        try:
+            self._queue.put((model, row), timeout=self.put_timeout)
+        except queue.Full:
+            self._release(model, 1)
+            with self._lock:
+                self.rejected += 1
+            return False
+        with self._lock:
+            self.enqueued += 1
+        return True
+
+    def enqueue_many(self, model, rows):
+        """
+        Queue as many rows as fit right now, without waiting. Returns the rows
+        that were not taken, which the caller must write itself.
+        """
+        rows = list(rows)
+        if not rows or not self.enabled or self.app is None or self._stopping.is_set():
+            return rows
+        allowed = self._reserve(model, len(rows))
+        taken = 0
+        if allowed:
+            self._ensure_worker()
+            for row in rows[:allowed]:
+                try:
+                    self._queue.put_nowait((model, row))
+                except queue.Full:
+                    break
+                taken += 1
+        self._release(model, allowed - taken)
+        with self._lock:
+            self.enqueued += taken
+            self.rejected += len(rows) - taken
+        return rows[taken:]
+
+    def _collect(self):
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=max(remaining, 0)) if remaining > 0
+                             else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not (self._stopping.is_set() and self._queue.empty()):
+            batch = self._collect()
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch):
+        grouped = {}
+        for model, row in batch:
+            grouped.setdefault(model, []).append(row)
+
+        started = time.perf_counter()
+        with self.app.app_context():
+            try:
+                committed = self._insert_groups(grouped)
+            finally:
+                db.session.remove()
+                for model, rows in grouped.items():
+                    self._release(model, len(rows))
+                for _ in batch:
+                    self._queue.task_done()
+
+        for model, rows in committed.items():
+            callback = self._callbacks.get(model)
+            if callback:
+                try:
+                    callback(rows)
+                except Exception as e:
+                    print(f"Write-behind callback error: {e}")
+
+        elapsed = (time.perf_counter() - started) * 1000.0
+        with self._lock:
+            self.batches += 1
+            self.last_flush_ms = elapsed
+            self.max_flush_ms = max(self.max_flush_ms, elapsed)
+            self._flush_ms_total += elapsed
+
+    def _insert(self, model, rows):
+        # Primary keys are only needed when someone consumes the rows afterwards
+        db.session.bulk_insert_mappings(model, rows, return_defaults=model in self._callbacks)
+        db.session.commit()
+
+    def _insert_groups(self, grouped):
+        """
+        Write every group in one transaction. If that fails, retry each model
+        group on its own, then each row of a failing group on its own, so one
+        bad row (FK violation, oversized value, ...) only loses itself.
+        Returns {model: committed rows}.
+        """
+        total = sum(len(rows) for rows in grouped.values())
+        try:
+            for model, rows in grouped.items():
+                db.session.bulk_insert_mappings(model, rows, return_defaults=model in self._callbacks)
+            db.session.commit()
+            with self._lock:
+                self.written += total
+            return grouped
+        except Exception as e:
+            db.session.rollback()
+            if total == 1:
+                return self._record_failed(grouped, e)
+            print(f"Write-behind batch of {total} rows failed, retrying per model/row: {e}")
+
+        committed = {}
+        for model, rows in grouped.items():
+            try:
+                self._insert(model, rows)
+                committed[model] = rows
+                with self._lock:
+                    self.written += len(rows)
+                continue
+            except Exception as e:
+                db.session.rollback()
+                if len(rows) == 1:
+                    self._record_failed({model: rows}, e)
+                    continue
+            for row in rows:
+                try:
+                    self._insert(model, [row])
+                    committed.setdefault(model, []).append(row)
+                    with self._lock:
+                        self.written += 1
+                except Exception as e:
+                    db.session.rollback()
+                    self._record_failed({model: [row]}, e)
+        return committed
+
+    def _record_failed(self, grouped, error):
+        for model, rows in grouped.items():
+            with self._lock:
+                self.failed += len(rows)
+            print(f"Write-behind dropped {len(rows)} {model.__name__} row(s): {error}")
+        return {}
+
+    def flush(self):
+        """Block until everything queued so far has been written."""
+        if self._worker is not None and self._worker.is_alive():
+            self._queue.join()
+
+    def shutdown(self):
+        self._stopping.set()
+        if self._worker is not None and self._worker.is_alive():
+            self._worker.join(timeout=30)
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'queue_depth': self._queue.qsize(),
+            'queue_capacity': self._queue.maxsize,
+            'pending_by_model': {model.__name__: count for model, count in self._pending.items()},
+            'limits_by_model': {model.__name__: limit for model, limit in self._limits.items()},
+            'enqueued': self.enqueued,
+            'rejected': self.rejected,
+            'written': self.written,
+            'failed': self.failed,
+            'batches': self.batches,
+            'avg_batch_size': round(self.written / self.batches, 2) if self.batches else 0,
+            'last_flush_ms': round(self.last_flush_ms, 2),
+            'avg_flush_ms': round(self._flush_ms_total / self.batches, 2) if self.batches else 0,
+            'max_flush_ms': round(self.max_flush_ms, 2)
+        }
+
+
+# Shared instance, bound to the app in app.py
+write_behind = WriteBehindQueue()
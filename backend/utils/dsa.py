@@ -1,3 +1,6 @@
+import threading
+import time
+
 def quick_sort(arr, key=lambda x: x, reverse=False):
     
     if len(arr) <= 1:
@@ -226,7 +229,9 @@ class HashTable:
         self.table = [[] for _ in range(size)]
 
     def _hash(self, key):
-        return sum(ord(c) for c in str(key)) % self.size
+        # Built-in hash spreads similar keys (e.g. 'stats_<minute>') across buckets;
+        # summing character codes put most of them in a handful of buckets.
+        return hash(key) % self.size
 
     def set(self, key, value):
         h = self._hash(key)
@@ -271,15 +276,60 @@ class Graph:
                     queue.append(v)
         return result
 
+class _LRUNode:
+    __slots__ = ('key', 'value', 'prev', 'next', 'expires_at', 'weight')
+
+    def __init__(self, key=None, value=None, expires_at=None, weight=1):
+        self.key = key
+        self.value = value
+        self.prev = None
+        self.next = None
+        self.expires_at = expires_at
+        self.weight = weight
+
+class _Flight:
+    # One in-progress get_or_compute; waiters share its outcome.
+    # generation is bumped by delete()/clear() while the compute runs.
+    __slots__ = ('done', 'value', 'error', 'generation')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.generation = 0
+
 class LRUCache:
-    """Manual LRU Cache for Auth sessions."""
-    def __init__(self, capacity):
+    """
+    Thread-safe O(1) LRU cache (hash map + doubly linked list).
+
+    - capacity: max number of entries (0 disables caching)
+    - ttl: default seconds an entry lives (None = no expiry); put() can override per entry
+    - max_weight / weigher: optional size bound, e.g. weigher=len for bytes values
+    - get_or_compute(): single-flight, so concurrent misses on one key compute it once
+    - clock: time source for expiry (injectable for soak tests)
+    """
+    def __init__(self, capacity, ttl=None, max_weight=None, weigher=None, clock=time.monotonic):
         self.capacity = capacity
-        self.cache = {} # key -> Node
-        self.head = Node(None) # Dummy head
-        self.tail = Node(None) # Dummy tail
+        self.clock = clock
+        self.ttl = ttl
+        self.max_weight = max_weight
+        self.weigher = weigher
+        self.cache = {} # key -> _LRUNode
+        self.weight = 0
+        self.head = _LRUNode() # Dummy head (most recent side)
+        self.tail = _LRUNode() # Dummy tail (least recent side)
         self.head.next = self.tail
         self.tail.prev = self.head
+        self._lock = threading.Lock()
+        self._inflight = {} # key -> _Flight for single-flight computes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.computes = 0
+        self.coalesced = 0
+        self.discarded = 0 # computes not cached because the key was deleted meanwhile
 
     def _remove(self, node):
         prev = node.prev
@@ -294,26 +344,158 @@ class LRUCache:
         node.next = next
         next.prev = node
 
-    def get(self, key):
-        if key in self.cache:
-            node = self.cache[key]
-            self._remove(node)
-            self._add(node)
-            return node.data
-        return None
+    def _unlink(self, node):
+        self._remove(node)
+        del self.cache[node.key]
+        self.weight -= node.weight
+
+    def _lookup(self, key):
+        # Caller holds the lock
+        node = self.cache.get(key)
+        if node is None:
+            return None
+        if node.expires_at is not None and node.expires_at <= self.clock():
+            self._unlink(node)
+            self.expirations += 1
+            return None
+        self._remove(node)
+        self._add(node)
+        return node
 
-    def put(self, key, value):
+    def get(self, key, default=None):
+        with self._lock:
+            node = self._lookup(key)
+            if node is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return node.value
+
+    def put(self, key, value, ttl=None):
+        if self.capacity <= 0:
+            return
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = self.clock() + ttl if ttl is not None else None
+        weight = self.weigher(value) if self.weigher else 1
+        with self._lock:
+            self._insert(key, value, expires_at, weight)
+
+    def _insert(self, key, value, expires_at, weight):
+        # Caller holds the lock
         if key in self.cache:
-            self._remove(self.cache[key])
-        node = Node(value)
-        node.key = key # For deletion
+            self._unlink(self.cache[key])
+        node = _LRUNode(key, value, expires_at, weight)
         self.cache[key] = node
         self._add(node)
-        if len(self.cache) > self.capacity:
+        self.weight += weight
+        while len(self.cache) > self.capacity or (
+                self.max_weight is not None and self.weight > self.max_weight and len(self.cache) > 1):
             # remove from tail
-            lru = self.tail.prev
-            self._remove(lru)
-            del self.cache[lru.key]
+            self._unlink(self.tail.prev)
+            self.evictions += 1
+
+    def get_or_compute(self, key, compute, ttl=None):
+        """
+        Return the cached value for key, or call compute() once and cache
+        its result. Concurrent callers missing on the same key wait for the
+        first one and get its result, or its exception re-raised, instead of
+        computing again. None results are returned but not cached, and
+        neither is a result whose key was deleted (or the cache cleared)
+        while compute() ran, since it may predate the change that caused it.
+        """
+        with self._lock:
+            node = self._lookup(key)
+            if node is not None:
+                self.hits += 1
+                return node.value
+            flight = self._inflight.get(key)
+            if flight is None:
+                self.misses += 1
+                flight = self._inflight[key] = _Flight()
+                owner = True
+            else:
+                self.coalesced += 1
+                owner = False
+        if not owner:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        try:
+            self.computes += 1
+            value = flight.value = compute()
+            if value is not None and self.capacity > 0:
+                ttl = self.ttl if ttl is None else ttl
+                expires_at = self.clock() + ttl if ttl is not None else None
+                weight = self.weigher(value) if self.weigher else 1
+                with self._lock:
+                    if flight.generation == 0:
+                        self._insert(key, value, expires_at, weight)
+                    else:
+                        self.discarded += 1
+            return value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.done.set()
+
+    def delete(self, key):
+        with self._lock:
+            node = self.cache.get(key)
+            if node is not None:
+                self._unlink(node)
+            flight = self._inflight.get(key)
+            if flight is not None:
+                flight.generation += 1
+
+    def clear(self):
+        with self._lock:
+            self.cache.clear()
+            for flight in self._inflight.values():
+                flight.generation += 1
+            self.head.next = self.tail
+            self.tail.prev = self.head
+            self.weight = 0
+
+    def items(self):
+        """Snapshot of unexpired (key, value) pairs, most recent first (does not touch recency)."""
+        with self._lock:
+            now = self.clock()
+            pairs, node = [], self.head.next
+            while node is not self.tail:
+                if node.expires_at is None or node.expires_at > now:
+                    pairs.append((node.key, node.value))
+                node = node.next
+            return pairs
+
+    def __len__(self):
+        return len(self.cache)
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._lookup(key) is not None
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self.cache),
+                'capacity': self.capacity,
+                'weight': self.weight,
+                'max_weight': self.max_weight,
+                'ttl_s': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'computes': self.computes,
+                'coalesced': self.coalesced,
+                'discarded': self.discarded
+            }
 
 class MinHeap:
     
@@ -354,8 +536,10 @@ class MinHeap:
             self._bubble_down(smallest)
 
 # Shared DSA objects for cross-blueprint communication
-user_cache = HashTable(size=100)
 admin_stack = Stack()
+# Admin/dashboard aggregates (services/stats_service.py): bounded and expiring, so it
+# cannot grow with uptime; entries get their TTL (STATS_REFRESH_SECONDS) on put
+admin_stats_cache = LRUCache(capacity=4096, ttl=60)
 
 
 
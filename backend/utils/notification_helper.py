@@ -1,5 +1,12 @@
+import hashlib
+import time
+from sqlalchemy import insert
+from config import Config
 from models import db, Notification
 from routes.notifications import notif_cache
+from services.write_behind import write_behind
+from services.weather_cache import normalize_location
+from utils.dsa import LRUCache
 from datetime import datetime
 
 def create_notification(user_id, title, message, notif_type='info'):
@@ -26,15 +33,109 @@ def create_notification(user_id, title, message, notif_type='info'):
         db.session.rollback()
         return None
 
-def process_weather_alerts(user_id, alerts):
+def _cache_notifications(rows):
+    # Runs on the write-behind thread once a batch of notifications is committed
+    for row in rows:
+        notif_cache.enqueue({
+            'id': row.get('id'),
+            'user_id': row['user_id'],
+            'title': row['title'],
+            'message': row['message'],
+            'type': row['type'],
+            'is_read': row['is_read'],
+            'created_at': row['created_at'].isoformat()
+        })
+
+write_behind.on_commit(Notification, _cache_notifications)
+
+def queue_notification(user_id, title, message, notif_type='info'):
+    """
+    Like create_notification, but written in the background by the
+    write-behind queue. Falls back to a synchronous insert when the queue is
+    disabled or full.
+    """
+    row = {
+        'user_id': user_id,
+        'title': title,
+        'message': message,
+        'type': notif_type,
+        'is_read': False,
+        'created_at': datetime.utcnow()
+    }
+    if write_behind.enqueue(Notification, row):
+        return True
+    return create_notification(user_id, title, message, notif_type) is not None
+
+# Dedup keys already stored (or just inserted) by this process; expire with the window
+_seen_alerts = LRUCache(capacity=Config.WEATHER_ALERT_DEDUP_SIZE, ttl=Config.WEATHER_ALERT_WINDOW)
+
+# INSERT that skips rows whose dedup_key already exists (another process won the race)
+_insert_alerts = insert(Notification.__table__) \
+    .prefix_with('OR IGNORE', dialect='sqlite') \
+    .prefix_with('IGNORE', dialect='mysql')
+
+def alert_dedup_key(user_id, alert_id, location, now=None):
+    window = int((now or time.time()) // Config.WEATHER_ALERT_WINDOW)
+    raw = f"{user_id}|{alert_id}|{normalize_location(location)}|{window}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+def process_weather_alerts(user_id, alerts, location=None):
     """
-    Takes a list of weather alerts and creates notifications for high severity ones.
+    Takes a list of weather alerts and creates notifications for high severity ones,
+    once per (user, alert id, location, WEATHER_ALERT_WINDOW). Repeat page views are
+    filtered by an in-memory set, then by one lookup on the unique dedup_key; the
+    remaining alerts are inserted in a single statement. Returns the number this call
+    inserted (alerts another process stored first are not counted).
     """
+    candidates = {}
     for alert in alerts:
-        if alert.get('severity') == 'high':
-            create_notification(
-                user_id=user_id,
-                title=alert['title'],
-                message=alert['message'],
-                notif_type='warning'
-            )
+        if alert.get('severity') != 'high':
+            continue
+        key = alert_dedup_key(user_id, alert.get('id') or alert['title'], location)
+        if key not in _seen_alerts and key not in candidates:
+            candidates[key] = alert
+    if not candidates:
+        return 0
+
+    try:
+        stored = db.session.query(Notification.dedup_key) \
+            .filter(Notification.dedup_key.in_(list(candidates))).all()
+        for (key,) in stored:
+            _seen_alerts.put(key, True)
+            del candidates[key]
+        if not candidates:
+            return 0
+
+        # Whole seconds: DATETIME columns on MySQL drop the fraction, and the
+        # read-back below compares against this value
+        now = datetime.utcnow().replace(microsecond=0)
+        rows = [{
+            'user_id': user_id,
+            'title': alert['title'],
+            'message': alert['message'],
+            'type': 'warning',
+            'is_read': False,
+            'created_at': now,
+            'dedup_key': key
+        } for key, alert in candidates.items()]
+        inserted = db.session.execute(_insert_alerts, rows).rowcount
+        db.session.commit()
+    except Exception as e:
+        print(f"Error creating weather alert notifications: {e}")
+        db.session.rollback()
+        return 0
+
+    for key in candidates:
+        _seen_alerts.put(key, True)
+    if inserted is None or inserted < 0:
+        inserted = len(rows)  # driver did not report a rowcount
+    if not inserted:
+        return 0
+    # Read back the rows this call inserted; the cache needs their ids for mark-read
+    query = Notification.query.filter(Notification.dedup_key.in_(list(candidates)))
+    if inserted < len(rows):
+        # Another process stored some of these keys first; those rows carry its created_at
+        query = query.filter(Notification.created_at == now)
+    for notif in query.all():
+        notif_cache.enqueue(notif.to_dict())
+    return inserted